@@ -1,23 +1,152 @@
-from django.contrib import admin
-from .models import Event, Photographer, Assignment
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from . import forecast
+from .models import Event, Photographer, Assignment, ArchivedEvent, ChangeLogEntry
+
+
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using='default'):
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+    elif connection.vendor == 'sqlite':
+        # Filled in by ANALYZE, which archive_events runs. A partial index
+        # only counts its own rows, so take the largest figure.
+        sql = 'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+# Admin actions can run on "select all" across a table of any size, so they
+# walk the selection in primary key order: no statement binds more ids than
+# this and only one chunk of rows is held in memory at a time.
+ACTION_CHUNK_SIZE = 500
+
+
+def in_chunks(queryset):
+    queryset = queryset.select_related(None).order_by('pk')
+    chunk = list(queryset[:ACTION_CHUNK_SIZE])
+    while chunk:
+        yield chunk
+        chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:ACTION_CHUNK_SIZE])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
-    list_display = ['event_name', 'event_date', 'photographers_required', 'created_at']
-    list_filter = ['event_date', 'created_at']
+class EventAdmin(ScalableModelAdmin):
+    list_display = ['event_name', 'starts_at', 'ends_at', 'photographers_required', 'created_at']
+    date_hierarchy = 'event_date'
     search_fields = ['event_name']
+    ordering = ['-created_at']
 
 
 @admin.register(Photographer)
-class PhotographerAdmin(admin.ModelAdmin):
+class PhotographerAdmin(ScalableModelAdmin):
     list_display = ['name', 'email', 'phone', 'is_active']
     list_filter = ['is_active']
     search_fields = ['name', 'email']
+    actions = ['mark_active', 'mark_inactive']
+
+    @admin.action(description='Mark selected photographers as active')
+    def mark_active(self, request, queryset):
+        updated = self.set_active(queryset, True)
+        self.message_user(request, f'{updated} photographer(s) marked active.', messages.SUCCESS)
+
+    @admin.action(description='Mark selected photographers as inactive')
+    def mark_inactive(self, request, queryset):
+        updated = self.set_active(queryset, False)
+        self.message_user(request, f'{updated} photographer(s) marked inactive.', messages.SUCCESS)
+
+    def set_active(self, queryset, is_active):
+        # QuerySet.update() skips post_save, so the change log is written
+        # here with one bulk insert per chunk instead.
+        updated = 0
+        now = timezone.now()
+        with transaction.atomic():
+            for photographers in in_chunks(queryset):
+                updated += Photographer.objects.filter(
+                    id__in=[photographer.id for photographer in photographers]
+                ).update(is_active=is_active, updated_at=now)
+                for photographer in photographers:
+                    photographer.is_active = is_active
+                    photographer.updated_at = now
+                ChangeLogEntry.record_many(photographers, ChangeLogEntry.ACTION_UPDATE)
+        forecast.invalidate_all()
+        return updated
 
 
 @admin.register(Assignment)
-class AssignmentAdmin(admin.ModelAdmin):
+class AssignmentAdmin(ScalableModelAdmin):
     list_display = ['event', 'photographer']
-    list_filter = ['event__event_date']
+    list_select_related = ['event', 'photographer']
+    date_hierarchy = 'event_date'
     search_fields = ['event__event_name', 'photographer__name']
+    autocomplete_fields = ['event', 'photographer']
+    ordering = ['-id']
+    actions = ['unassign_selected']
+
+    @admin.action(description='Unassign selected photographers')
+    def unassign_selected(self, request, queryset):
+        # Assignment has no dependants, so with the change log written in
+        # bulk up front each chunk is a single DELETE ... WHERE id IN (...).
+        deleted = 0
+        spans = set()
+        with transaction.atomic():
+            for assignments in in_chunks(queryset):
+                ChangeLogEntry.record_many(assignments, ChangeLogEntry.ACTION_DELETE)
+                deleted += Assignment.objects.filter(
+                    id__in=[assignment.id for assignment in assignments]
+                )._raw_delete(Assignment.objects.db)
+                spans.update(
+                    (assignment.event_date, assignment.last_date) for assignment in assignments
+                )
+        forecast.invalidate_spans(*spans)
+        self.message_user(request, f'{deleted} assignment(s) removed.', messages.SUCCESS)
+
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(ScalableModelAdmin):
+    list_display = ['event_name', 'event_date', 'photographers_required', 'archived_at']
+    date_hierarchy = 'event_date'
+    search_fields = ['event_name']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.SLOW_QUERY_THRESHOLD_MS is not None:
+            from .profiling import install_slow_query_log
+
+            connection_created.connect(install_slow_query_log)
@@ -0,0 +1,80 @@
+from django.db import connections, router, transaction
+from .models import Event, Assignment, ArchivedEvent, ArchivedAssignment
+
+
+def archive_batch(cutoff, batch_size):
+    db = router.db_for_write(Event)
+    with transaction.atomic(using=db):
+        # An event is archived only once its last day is before the cutoff, so
+        # one still running keeps its photographers booked. The event_date
+        # bound is implied by it but keeps the lookup on an index.
+        events = list(
+            Event.objects.using(db)
+            .filter(event_date__lt=cutoff, last_date__lt=cutoff)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+        event_ids = [event.id for event in events]
+        assignments = list(
+            Assignment.objects.using(db).filter(event_id__in=event_ids).order_by()
+        )
+
+        ArchivedEvent.objects.using(db).bulk_create([
+            ArchivedEvent(
+                id=event.id,
+                event_name=event.event_name,
+                event_date=event.event_date,
+                last_date=event.last_date,
+                starts_at=event.starts_at,
+                ends_at=event.ends_at,
+                photographers_required=event.photographers_required,
+                created_at=event.created_at,
+                updated_at=event.updated_at
+            )
+            for event in events
+        ])
+        ArchivedAssignment.objects.using(db).bulk_create([
+            ArchivedAssignment(
+                id=assignment.id,
+                event_id=assignment.event_id,
+                photographer_id=assignment.photographer_id,
+                event_date=assignment.event_date,
+                last_date=assignment.last_date,
+                starts_at=assignment.starts_at,
+                ends_at=assignment.ends_at,
+                updated_at=assignment.updated_at
+            )
+            for assignment in assignments
+        ])
+
+        # Moving rows is not a delete from the API's point of view, so skip
+        # the per-row collector and its change log signals.
+        Assignment.objects.using(db).filter(event_id__in=event_ids)._raw_delete(db)
+        Event.objects.using(db).filter(id__in=event_ids)._raw_delete(db)
+    return len(events), len(assignments)
+
+
+def refresh_statistics(using):
+    # The admin's estimated counts come from sqlite_stat1, which only ANALYZE
+    # fills in. Sampling a limited number of rows per index keeps this cheap
+    # on large tables; other backends keep their statistics up by themselves.
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA analysis_limit = 1000')
+        cursor.execute('ANALYZE')
+        cursor.execute('PRAGMA analysis_limit = 0')
+
+
+def archive_events(cutoff, batch_size=1000):
+    total_events = total_assignments = 0
+    while True:
+        events, assignments = archive_batch(cutoff, batch_size)
+        if not events:
+            break
+        total_events += events
+        total_assignments += assignments
+    refresh_statistics(router.db_for_write(Event))
+    return total_events, total_assignments
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from . import forecast, roster
+from .models import Photographer, Assignment, ChangeLogEntry, is_whole_day
+
+
+class AssignmentError(Exception):
+    def __init__(self, payload):
+        super().__init__(payload['error'])
+        self.payload = payload
+
+
+def bookings_starting_before(ends_at, photographer, **exclude):
+    bookings = Assignment.objects.filter(photographer=photographer, starts_at__lt=ends_at)
+    if exclude:
+        bookings = bookings.exclude(**exclude)
+    return bookings.order_by('-starts_at').values_list('ends_at', flat=True)
+
+
+def free_photographers(starts_at, ends_at):
+    # A photographer's bookings never overlap one another (assignment and
+    # Event.save() both refuse to create an overlap), so the only one that
+    # can overlap [starts_at, ends_at) is the last to start before ends_at.
+    # The (photographer, starts_at) index finds it with one seek per
+    # photographer, however long their booking history is.
+    return Photographer.objects.filter(is_active=True).alias(
+        last_end=Subquery(bookings_starting_before(ends_at, OuterRef('pk'))[:1])
+    ).filter(Q(last_end__isnull=True) | Q(last_end__lte=starts_at))
+
+
+def photographer_is_free(photographer, starts_at, ends_at, exclude=None):
+    exclude = {} if exclude is None else {'pk': exclude}
+    last_end = bookings_starting_before(ends_at, photographer, **exclude).first()
+    return last_end is None or last_end <= starts_at
+
+
+def double_booked_photographers(event, starts_at, ends_at):
+    # The photographers assigned to event who would overlap another of their
+    # bookings if the event moved to [starts_at, ends_at).
+    return Photographer.objects.filter(assignments__event=event).alias(
+        last_end=Subquery(bookings_starting_before(ends_at, OuterRef('pk'), event=event)[:1])
+    ).filter(last_end__gt=starts_at)
+
+
+def available_from_snapshot(event):
+    # The snapshot has one row per day, so it can only answer for events
+    # made of whole days.
+    if not is_whole_day(event.starts_at, event.ends_at):
+        return None
+    snapshot = roster.get_snapshot()
+    if snapshot is None or snapshot.version != roster.current_version():
+        return None
+    photographer_ids = snapshot.available(
+        timezone.localdate(event.starts_at),
+        event.photographers_required,
+        last_day=timezone.localdate(event.ends_at) - timedelta(days=1)
+    )
+    if photographer_ids is None:
+        return None
+    photographers = Photographer.objects.in_bulk(photographer_ids)
+    return [photographers[photographer_id] for photographer_id in photographer_ids]
+
+
+def assign_available_photographers(event, check_existing=True):
+    if event.photographers_required <= 0:
+        raise AssignmentError({'error': 'Photographers required must be greater than 0'})
+
+    if event.ends_at <= timezone.now():
+        raise AssignmentError({'error': 'Cannot assign photographers to past events'})
+
+    # The availability read and the insert share one transaction so that
+    # overlapping concurrent requests cannot both pick a photographer;
+    # on SQLite this relies on the IMMEDIATE transaction mode in settings.
+    with transaction.atomic():
+        if check_existing:
+            existing_assignments = Assignment.objects.filter(event=event).count()
+            if existing_assignments > 0:
+                raise AssignmentError({
+                    'error': 'Photographers already assigned to this event',
+                    'assigned_count': existing_assignments
+                })
+
+        available_photographers = available_from_snapshot(event)
+        if available_photographers is None:
+            available_photographers = list(
+                free_photographers(
+                    event.starts_at,
+                    event.ends_at
+                ).order_by('name', 'id')[:event.photographers_required]
+            )
+
+        if len(available_photographers) < event.photographers_required:
+            raise AssignmentError({
+                'error': 'Not enough photographers available',
+                'required': event.photographers_required,
+                'available': len(available_photographers)
+            })
+
+        # bulk_create skips save() and post_save, so the denormalised date, the
+        # change log and the forecast cache are handled here for the whole batch.
+        assignments = Assignment.objects.bulk_create([
+            Assignment(
+                event=event,
+                photographer=photographer,
+                event_date=event.event_date,
+                last_date=event.last_date,
+                starts_at=event.starts_at,
+                ends_at=event.ends_at
+            )
+            for photographer in available_photographers
+        ])
+        ChangeLogEntry.record_many(assignments, ChangeLogEntry.ACTION_INSERT)
+    forecast.invalidate_spans((event.event_date, event.last_date))
+    return assignments
@@ -0,0 +1,199 @@
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from .models import Event, Photographer, Assignment
+
+GENERATION_KEY = 'capacity-forecast:generation'
+
+
+def bucket_of(day):
+    return day.strftime('%Y-%m')
+
+
+def buckets_between(first, last):
+    month = first.replace(day=1)
+    while month <= last:
+        yield bucket_of(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def bucket_range(bucket):
+    start = date.fromisoformat(f'{bucket}-01')
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.add(GENERATION_KEY, generation, None)
+        generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def bucket_key(generation, bucket):
+    return f'capacity-forecast:{generation}:{bucket}'
+
+
+def invalidate_spans(*spans):
+    # Each span is a (first day, last day) pair; a multi-day event can touch
+    # more than one month.
+    generation = get_generation()
+    cache.delete_many({
+        bucket_key(generation, bucket)
+        for first, last in spans if first is not None
+        for bucket in buckets_between(first, last or first)
+    })
+
+
+def invalidate_all():
+    # Photographer changes move the free count on every date, so start a new
+    # generation rather than enumerating buckets.
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def later_days(first, last, start, end):
+    # The days after first, up to and including last, inside [start, end].
+    day = max(first + timedelta(days=1), start)
+    while day <= min(last, end):
+        yield day
+        day += timedelta(days=1)
+
+
+def compute_buckets(buckets):
+    start = bucket_range(min(buckets))[0]
+    end = bucket_range(max(buckets))[1]
+    days = {bucket: {} for bucket in buckets}
+
+    def figures_for(day):
+        bucket = days.get(bucket_of(day))
+        if bucket is None:
+            return None
+        return bucket.setdefault(
+            day.isoformat(),
+            {'events': 0, 'required': 0, 'booked': 0, 'busy': 0}
+        )
+
+    # The aggregates count every event and booking on the day it starts.
+    # Those that run on past that day are few; the partial multi-day indexes
+    # find them, and they are added to their later days here.
+    multi_day = Q(last_date__gt=F('event_date'), last_date__gte=start, event_date__lte=end)
+
+    demand = Event.objects.filter(event_date__range=(start, end)).values(
+        'event_date'
+    ).annotate(
+        events=Count('id'),
+        required=Sum('photographers_required')
+    ).order_by()
+    for row in demand:
+        figures = figures_for(row['event_date'])
+        if figures is not None:
+            figures['events'] = row['events']
+            figures['required'] = row['required']
+    for first, last, required in Event.objects.filter(multi_day).values_list(
+        'event_date', 'last_date', 'photographers_required'
+    ).order_by():
+        for day in later_days(first, last, start, end):
+            figures = figures_for(day)
+            if figures is not None:
+                figures['events'] += 1
+                figures['required'] += required
+
+    bookings = Assignment.objects.filter(event_date__range=(start, end)).values(
+        'event_date'
+    ).annotate(
+        booked=Count('id'),
+        busy=Count('photographer', distinct=True)
+    ).order_by()
+    # Inactive photographers are few; counting their bookings separately keeps
+    # the main aggregate on the (event_date, photographer) index with no join.
+    inactive_busy = {
+        row['event_date']: row['busy']
+        for row in Assignment.objects.filter(
+            event_date__range=(start, end),
+            photographer__is_active=False
+        ).values('event_date').annotate(
+            busy=Count('photographer', distinct=True)
+        ).order_by()
+    }
+    for row in bookings:
+        figures = figures_for(row['event_date'])
+        if figures is not None:
+            figures['booked'] = row['booked']
+            figures['busy'] = row['busy'] - inactive_busy.get(row['event_date'], 0)
+
+    carried = [
+        (day, photographer_id, is_active)
+        for photographer_id, first, last, is_active in Assignment.objects.filter(
+            multi_day
+        ).values_list(
+            'photographer_id', 'event_date', 'last_date', 'photographer__is_active'
+        ).order_by()
+        for day in later_days(first, last, start, end)
+    ]
+    if carried:
+        # A photographer already counted as busy on a day through a booking
+        # that starts that day is not counted twice.
+        starting = set(Assignment.objects.filter(
+            event_date__in={day for day, _, _ in carried},
+            photographer_id__in={photographer_id for _, photographer_id, _ in carried}
+        ).values_list('event_date', 'photographer_id'))
+        for day, photographer_id, is_active in carried:
+            figures = figures_for(day)
+            if figures is None:
+                continue
+            figures['booked'] += 1
+            if is_active and (day, photographer_id) not in starting:
+                figures['busy'] += 1
+
+    return days
+
+
+def capacity_forecast(start, end):
+    generation = get_generation()
+    timeout = settings.CAPACITY_FORECAST_CACHE_SECONDS
+
+    buckets = list(buckets_between(start, end))
+    keys = {bucket: bucket_key(generation, bucket) for bucket in buckets}
+    active_key = f'capacity-forecast:{generation}:active'
+    cached = cache.get_many([*keys.values(), active_key])
+
+    missing = [bucket for bucket in buckets if keys[bucket] not in cached]
+    if missing:
+        computed = compute_buckets(missing)
+        cache.set_many(
+            {keys[bucket]: days for bucket, days in computed.items()},
+            timeout
+        )
+        cached.update({keys[bucket]: days for bucket, days in computed.items()})
+
+    active = cached.get(active_key)
+    if active is None:
+        active = Photographer.objects.filter(is_active=True).count()
+        cache.set(active_key, active, timeout)
+
+    results = []
+    for bucket in buckets:
+        for day, figures in sorted(cached[keys[bucket]].items()):
+            if not start.isoformat() <= day <= end.isoformat():
+                continue
+            unfilled = max(figures['required'] - figures['booked'], 0)
+            free = max(active - figures['busy'], 0)
+            results.append({
+                'date': day,
+                'events': figures['events'],
+                'required': figures['required'],
+                'booked': figures['booked'],
+                'unfilled': unfilled,
+                'free': free,
+                'shortfall': max(unfilled - free, 0),
+            })
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'active_photographers': active,
+        'dates': results,
+    }
@@ -0,0 +1,52 @@
+from datetime import timezone as dt_timezone
+from django.utils import timezone
+from .models import is_whole_day
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    # RFC 5545 limits content lines to 75 octets; continuations start with a space.
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def schedule_calendar(photographer, assignments):
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold('PRODID:-//Photographer Assignment System//Schedule//EN')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold(f'X-WR-CALNAME:{escape(photographer.name)}')
+    for assignment in assignments:
+        event = assignment.event
+        stamp = assignment.updated_at.astimezone(dt_timezone.utc)
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:assignment-{assignment.id}@photographer-assignment')
+        yield fold(f'DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}')
+        if is_whole_day(event.starts_at, event.ends_at):
+            yield fold(f'DTSTART;VALUE=DATE:{timezone.localdate(event.starts_at):%Y%m%d}')
+            yield fold(f'DTEND;VALUE=DATE:{timezone.localdate(event.ends_at):%Y%m%d}')
+        else:
+            yield fold(f'DTSTART:{event.starts_at.astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}')
+            yield fold(f'DTEND:{event.ends_at.astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}')
+        yield fold(f'SUMMARY:{escape(event.event_name)}')
+        yield fold('END:VEVENT')
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,56 @@
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from events.archive import archive_events
+
+
+class Command(BaseCommand):
+    help = 'Moves past events and their assignments into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help='Archive events that took place more than this many days ago'
+        )
+        parser.add_argument(
+            '--before',
+            help='Archive events dated before this YYYY-MM-DD date instead of using --days'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of events moved per transaction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep archiving every this many seconds instead of running once'
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format')
+        else:
+            cutoff = None
+        if options['days'] < 0:
+            raise CommandError('--days cannot be negative')
+
+        while True:
+            run_cutoff = cutoff or date.today() - timedelta(days=options['days'])
+            if run_cutoff > date.today():
+                raise CommandError('Cannot archive events that have not happened yet')
+            events, assignments = archive_events(run_cutoff, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Archived {events} events and {assignments} assignments dated before {run_cutoff}'
+            ))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from events.roster import build_snapshot, current_version, get_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Writes the shared roster snapshot used for availability lookups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep the snapshot fresh, checking for changes every this many seconds'
+        )
+
+    def handle(self, *args, **options):
+        path = settings.ROSTER_SNAPSHOT_PATH
+        while True:
+            snapshot = get_snapshot()
+            if snapshot is not None and snapshot.version == current_version():
+                self.stdout.write(f'Roster snapshot is current (version {snapshot.version})')
+            else:
+                version = build_snapshot(path)
+                self.stdout.write(self.style.SUCCESS(
+                    f'Wrote roster snapshot version {version} to {path}'
+                ))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from events.forecast import capacity_forecast
+
+
+class Command(BaseCommand):
+    help = 'Prints required, booked and free photographers per future event date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Number of days ahead to forecast'
+        )
+        parser.add_argument(
+            '--shortfall-only',
+            action='store_true',
+            help='Only list dates where demand exceeds free photographers'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if not 0 <= days <= settings.CAPACITY_FORECAST_MAX_DAYS:
+            raise CommandError(
+                f'--days must be between 0 and {settings.CAPACITY_FORECAST_MAX_DAYS}'
+            )
+
+        start = date.today()
+        report = capacity_forecast(start, start + timedelta(days=days))
+        self.stdout.write(
+            f"Forecast {report['from']} to {report['to']}, "
+            f"{report['active_photographers']} active photographers"
+        )
+        self.stdout.write(f"{'date':<12}{'required':>10}{'booked':>8}{'unfilled':>10}{'free':>6}{'short':>7}")
+
+        shortfalls = 0
+        for day in report['dates']:
+            if options['shortfall_only'] and not day['shortfall']:
+                continue
+            line = (
+                f"{day['date']:<12}{day['required']:>10}{day['booked']:>8}"
+                f"{day['unfilled']:>10}{day['free']:>6}{day['shortfall']:>7}"
+            )
+            if day['shortfall']:
+                shortfalls += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if shortfalls:
+            self.stdout.write(self.style.WARNING(f'{shortfalls} date(s) short of photographers'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No shortfalls in the forecast window'))
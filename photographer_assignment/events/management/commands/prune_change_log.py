@@ -0,0 +1,48 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from events.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = 'Deletes change log entries older than the retention window, keeping the newest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.CHANGE_FEED_RETENTION_DAYS,
+            help='Keep entries newer than this many days'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of sequence numbers to delete per statement'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # The newest entry is always kept: it is the high-water mark that
+        # tells the feed a cursor was issued and has since been pruned.
+        newest_id = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first()
+        expired = ChangeLogEntry.objects.filter(created_at__lt=cutoff, id__lt=newest_id or 0)
+        first_id = expired.order_by('id').values_list('id', flat=True).first()
+        last_id = expired.order_by('-id').values_list('id', flat=True).first()
+
+        deleted = 0
+        if first_id is not None:
+            start = first_id
+            while start <= last_id:
+                end = min(start + options['batch_size'] - 1, last_id)
+                count, _ = ChangeLogEntry.objects.filter(
+                    id__gte=start,
+                    id__lte=end
+                ).delete()
+                deleted += count
+                start = end + 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Pruned {deleted} change log entries older than {cutoff:%Y-%m-%d %H:%M}')
+        )
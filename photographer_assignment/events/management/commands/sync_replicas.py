@@ -0,0 +1,47 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def replicate(source_path, target_path):
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        # The backup API copies a consistent snapshot even while the
+        # primary is being written to.
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database into each replica (local replication stand-in)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep syncing every this many seconds instead of syncing once'
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        replicas = {alias: settings.DATABASES[alias] for alias in settings.DATABASE_REPLICAS}
+        if not replicas:
+            raise CommandError('No replicas configured, set DATABASE_REPLICA_COUNT')
+        for config in [primary, *replicas.values()]:
+            if config['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('sync_replicas only supports SQLite databases')
+
+        while True:
+            for alias, config in replicas.items():
+                replicate(primary['NAME'], config['NAME'])
+                self.stdout.write(f'Synced {alias}')
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Replicas are in sync with the primary'))
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_event_dates(apps, schema_editor):
+    Assignment = apps.get_model('events', 'Assignment')
+    Event = apps.get_model('events', 'Event')
+    Assignment.objects.update(
+        event_date=Subquery(
+            Event.objects.filter(pk=OuterRef('event_id')).values('event_date')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='event_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(copy_event_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='assignment',
+            name='event_date',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['photographer', 'event_date'], name='events_assi_photogr_5e4048_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['event_date', 'photographer'], name='events_assi_event_d_ae63d9_idx'),
+        ),
+    ]
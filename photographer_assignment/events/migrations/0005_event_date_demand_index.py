@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_assignment_event_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='event_date',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date', 'photographers_required'], name='events_even_event_d_6405c9_idx'),
+        ),
+    ]
@@ -0,0 +1,127 @@
+from datetime import datetime, time, timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def whole_day(day):
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    )
+
+
+def fill_whole_day_intervals(apps, schema_editor):
+    # Every existing row covers one whole day, and the denormalised
+    # event_date on assignments matches their event, so one UPDATE per
+    # distinct date fills each table through its event_date index.
+    for model_name in ('Event', 'Assignment', 'ArchivedEvent', 'ArchivedAssignment'):
+        model = apps.get_model('events', model_name)
+        days = model.objects.order_by().values_list('event_date', flat=True).distinct()
+        for day in list(days):
+            starts_at, ends_at = whole_day(day)
+            model.objects.filter(event_date=day).update(starts_at=starts_at, ends_at=ends_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='starts_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='starts_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedassignment',
+            name='starts_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedassignment',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(fill_whole_day_intervals, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='event_date',
+            field=models.DateField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='event_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='archivedevent',
+            name='starts_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedevent',
+            name='ends_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedassignment',
+            name='starts_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedassignment',
+            name='ends_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['photographer', 'starts_at'], name='events_assi_photogr_d8f1f7_idx'),
+        ),
+    ]
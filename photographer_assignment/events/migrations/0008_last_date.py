@@ -0,0 +1,61 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_last_dates(apps, schema_editor):
+    # Rows with the same ends_at share a last day, and most events are whole
+    # days, so group the distinct ends_at values by the day they end on and
+    # fill each group with one UPDATE per chunk.
+    for model_name in ('Event', 'Assignment'):
+        model = apps.get_model('events', model_name)
+        ends = defaultdict(list)
+        for ends_at in model.objects.order_by().values_list('ends_at', flat=True).distinct():
+            ends[timezone.localdate(ends_at - timedelta(microseconds=1))].append(ends_at)
+        for day, values in ends.items():
+            for start in range(0, len(values), 500):
+                model.objects.filter(ends_at__in=values[start:start + 500]).update(last_date=day)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_intervals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='last_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='last_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(fill_last_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='last_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='last_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('last_date__gt', models.F('event_date'))), fields=['last_date'], name='events_event_multiday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['photographer', 'last_date'], name='events_assi_photogr_bd1d57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(condition=models.Q(('last_date__gt', models.F('event_date'))), fields=['last_date'], name='events_assignment_multiday_idx'),
+        ),
+    ]
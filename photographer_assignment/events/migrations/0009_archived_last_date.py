@@ -0,0 +1,56 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_last_dates(apps, schema_editor):
+    # Same grouping as 0008: one UPDATE per chunk of distinct ends_at values
+    # that end on the same day.
+    for model_name in ('ArchivedEvent', 'ArchivedAssignment'):
+        model = apps.get_model('events', model_name)
+        ends = defaultdict(list)
+        for ends_at in model.objects.order_by().values_list('ends_at', flat=True).distinct():
+            ends[timezone.localdate(ends_at - timedelta(microseconds=1))].append(ends_at)
+        for day, values in ends.items():
+            for start in range(0, len(values), 500):
+                model.objects.filter(ends_at__in=values[start:start + 500]).update(last_date=day)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_last_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedevent',
+            name='last_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedassignment',
+            name='last_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(fill_last_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedevent',
+            name='last_date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedassignment',
+            name='last_date',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(condition=models.Q(('last_date__gt', models.F('event_date'))), fields=['last_date'], name='events_archived_multiday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedassignment',
+            index=models.Index(fields=['photographer', 'last_date'], name='events_arch_photogr_8eb3f5_idx'),
+        ),
+    ]
@@ -1,27 +1,155 @@
-from django.db import models
+from datetime import datetime, time, timedelta
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+
+def whole_day(day, days=1):
+    # Events are half-open intervals [starts_at, ends_at) in the current time zone.
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(datetime.combine(day + timedelta(days=days), time.min))
+    )
+
+
+def last_day(ends_at):
+    # The local date of the last day an interval ending at ends_at touches.
+    return timezone.localdate(ends_at - timedelta(microseconds=1))
+
+
+def is_whole_day(starts_at, ends_at):
+    return (
+        timezone.localtime(starts_at).time() == time.min
+        and timezone.localtime(ends_at).time() == time.min
+    )
 
 
 class Event(models.Model):
     event_name = models.CharField(max_length=200)
-    event_date = models.DateField()
+    # The local date the event starts on; kept in step with starts_at.
+    event_date = models.DateField(blank=True)
+    starts_at = models.DateTimeField(blank=True)
+    ends_at = models.DateTimeField(blank=True)
+    # The local date of the last day the event touches; event_date for a
+    # single-day event.
+    last_date = models.DateField(editable=False)
     photographers_required = models.IntegerField(
         validators=[MinValueValidator(1)]
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # event_date, last_date and (starts_at, ends_at) as last loaded from or
+    # saved to the database; None if unknown.
+    _loaded_event_date = None
+    _loaded_last_date = None
+    _loaded_interval = None
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Covers the per-date demand aggregate as well as date lookups.
+            models.Index(fields=['event_date', 'photographers_required']),
+            # Only the few events that run past their first day.
+            models.Index(
+                fields=['last_date'],
+                condition=Q(last_date__gt=F('event_date')),
+                name='events_event_multiday_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.event_name} on {self.event_date}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_event_date = instance.__dict__.get('event_date')
+        instance._loaded_last_date = instance.__dict__.get('last_date')
+        instance._loaded_interval = (
+            instance.__dict__.get('starts_at'),
+            instance.__dict__.get('ends_at')
+        )
+        return instance
+
+    def clean(self):
+        if self.event_date is None and self.starts_at is None:
+            raise ValidationError('Give either event_date or starts_at and ends_at.')
+        if (self.starts_at is None) != (self.ends_at is None):
+            raise ValidationError('starts_at and ends_at must be given together.')
+        if self.starts_at is not None and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': 'ends_at must be after starts_at.'})
+        if not self._state.adding:
+            self.sync_interval()
+            if self._loaded_interval != (self.starts_at, self.ends_at):
+                self.check_move()
+
+    def sync_interval(self):
+        # Without an interval the event covers the whole of event_date.
+        # Changing only event_date moves the interval by whole days, keeping
+        # its times; otherwise event_date follows starts_at.
+        if self.starts_at is None or self.ends_at is None:
+            self.starts_at, self.ends_at = whole_day(self.event_date)
+        elif self.event_date is None or self.event_date == self._loaded_event_date:
+            self.event_date = timezone.localdate(self.starts_at)
+        elif self.event_date != timezone.localdate(self.starts_at):
+            duration = self.ends_at - self.starts_at
+            self.starts_at = timezone.make_aware(datetime.combine(
+                self.event_date,
+                timezone.localtime(self.starts_at).time()
+            ))
+            self.ends_at = self.starts_at + duration
+        self.last_date = last_day(self.ends_at)
+
+    def check_move(self):
+        # Assignments move with the event, so a new interval must not overlap
+        # any other booking of the photographers already assigned.
+        from .assignment import double_booked_photographers
+        clashing = list(double_booked_photographers(self, self.starts_at, self.ends_at))
+        if clashing:
+            raise ValidationError(
+                '%s already booked at the new time.' % ', '.join(map(str, clashing))
+            )
+
+    def save(self, *args, **kwargs):
+        self.sync_interval()
+        interval = (self.starts_at, self.ends_at)
+        moved = not self._state.adding and self._loaded_interval != interval
+        with transaction.atomic():
+            if moved:
+                self.check_move()
+            super().save(*args, **kwargs)
+            if moved:
+                # A moved assignment is an update for the change feed and the
+                # iCal DTSTAMP, like any other, so stamp and log it as well.
+                moved_ids = list(self.assignments.exclude(
+                    starts_at=self.starts_at,
+                    ends_at=self.ends_at
+                ).values_list('id', flat=True))
+                if moved_ids:
+                    moved_assignments = Assignment.objects.filter(id__in=moved_ids)
+                    moved_assignments.update(
+                        event_date=self.event_date,
+                        last_date=self.last_date,
+                        starts_at=self.starts_at,
+                        ends_at=self.ends_at,
+                        updated_at=timezone.now()
+                    )
+                    ChangeLogEntry.record_many(moved_assignments, ChangeLogEntry.ACTION_UPDATE)
+        self._loaded_event_date = self.event_date
+        self._loaded_last_date = self.last_date
+        self._loaded_interval = interval
+
 
 class Photographer(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
@@ -41,10 +169,161 @@ class Assignment(models.Model):
         on_delete=models.CASCADE,
         related_name='assignments'
     )
+    # Copies of the event's date and interval so schedule windows and
+    # conflict checks are answered from this table's indexes without a join.
+    event_date = models.DateField(editable=False)
+    last_date = models.DateField(editable=False)
+    starts_at = models.DateTimeField(editable=False)
+    ends_at = models.DateTimeField(editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['event', 'photographer']
         ordering = ['event', 'photographer']
+        indexes = [
+            models.Index(fields=['photographer', 'event_date']),
+            models.Index(fields=['event_date', 'photographer']),
+            # Schedule windows: a booking is in the window when it starts by
+            # the last day and its last day is on or after the first.
+            models.Index(fields=['photographer', 'last_date']),
+            models.Index(
+                fields=['last_date'],
+                condition=Q(last_date__gt=F('event_date')),
+                name='events_assignment_multiday_idx'
+            ),
+            # Each photographer's bookings in start order; see
+            # assignment.free_photographers().
+            models.Index(fields=['photographer', 'starts_at']),
+        ]
 
     def __str__(self):
         return f"{self.photographer.name} assigned to {self.event.event_name}"
+
+    def clean(self):
+        from .assignment import photographer_is_free
+        if self.event_id is None or self.photographer_id is None:
+            return
+        if not photographer_is_free(
+            self.photographer_id,
+            self.event.starts_at,
+            self.event.ends_at,
+            exclude=self.pk
+        ):
+            raise ValidationError(
+                f'{self.photographer} is already booked during {self.event}.'
+            )
+
+    def save(self, *args, **kwargs):
+        self.event_date = self.event.event_date
+        self.last_date = self.event.last_date
+        self.starts_at = self.event.starts_at
+        self.ends_at = self.event.ends_at
+        super().save(*args, **kwargs)
+
+
+class ArchivedEvent(models.Model):
+    # Keeps the hot table's id so archived rows can be looked up by the same id.
+    id = models.BigIntegerField(primary_key=True)
+    event_name = models.CharField(max_length=200)
+    event_date = models.DateField(db_index=True)
+    last_date = models.DateField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    photographers_required = models.IntegerField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['last_date'],
+                condition=Q(last_date__gt=F('event_date')),
+                name='events_archived_multiday_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_name} on {self.event_date} (archived)"
+
+
+class ArchivedAssignment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    event = models.ForeignKey(
+        ArchivedEvent,
+        on_delete=models.CASCADE,
+        related_name='assignments'
+    )
+    photographer = models.ForeignKey(
+        Photographer,
+        on_delete=models.CASCADE,
+        related_name='archived_assignments'
+    )
+    event_date = models.DateField()
+    last_date = models.DateField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['event', 'photographer']
+        indexes = [
+            models.Index(fields=['photographer', 'event_date']),
+            models.Index(fields=['photographer', 'last_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.photographer.name} assigned to {self.event.event_name} (archived)"
+
+
+class ChangeLogEntry(models.Model):
+    ACTION_INSERT = 'insert'
+    ACTION_UPDATE = 'update'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_INSERT, 'Insert'),
+        (ACTION_UPDATE, 'Update'),
+        (ACTION_DELETE, 'Delete'),
+    ]
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.model} {self.object_id}"
+
+    @staticmethod
+    def snapshot(instance):
+        return {
+            field.attname: field.value_from_object(instance)
+            for field in instance._meta.concrete_fields
+        }
+
+    @classmethod
+    def build(cls, instance, action):
+        return cls(
+            model=instance._meta.model_name,
+            object_id=instance.pk,
+            action=action,
+            data=cls.snapshot(instance)
+        )
+
+    @classmethod
+    def record(cls, instance, action):
+        entry = cls.build(instance, action)
+        entry.save()
+        return entry
+
+    @classmethod
+    def record_many(cls, instances, action):
+        return cls.objects.bulk_create(
+            [cls.build(instance, action) for instance in instances]
+        )
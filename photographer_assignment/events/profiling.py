@@ -0,0 +1,183 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from rest_framework.views import APIView
+
+slow_query_logger = logging.getLogger('events.slow_queries')
+
+# Only one cProfile profiler can be active per process (Python 3.12+ raises
+# otherwise), so concurrent requests in threaded workers go unprofiled.
+profile_lock = threading.Lock()
+
+
+def find_query_origin():
+    view = serializer = None
+    frame = sys._getframe(1)
+    while frame is not None and view is None:
+        owner = frame.f_locals.get('self')
+        if serializer is None and isinstance(owner, BaseSerializer):
+            if isinstance(owner, ListSerializer):
+                owner = owner.child
+            serializer = type(owner).__name__
+        elif isinstance(owner, APIView):
+            action = getattr(owner, 'action', None)
+            view = f"{type(owner).__name__}.{action}" if action else type(owner).__name__
+        frame = frame.f_back
+    return view, serializer
+
+
+class QueryTimer:
+    def __init__(self, alias, on_query):
+        self.alias = alias
+        self.on_query = on_query
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.on_query(self.alias, sql, time.perf_counter() - start)
+
+
+def log_slow_query(alias, sql, duration):
+    duration_ms = duration * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    view, serializer = find_query_origin()
+    slow_query_logger.warning(
+        '%.1fms on %s view=%s serializer=%s sql=%s',
+        duration_ms, alias, view, serializer, sql
+    )
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    # connection_created fires on every reconnect of the same wrapper.
+    if not any(
+        isinstance(wrapper, QueryTimer) and wrapper.on_query is log_slow_query
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(QueryTimer(connection.alias, log_slow_query))
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        if self.ident is not None:
+            self.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class RequestProfilerMiddleware:
+    header = 'HTTP_X_PROFILE'
+    query_param = 'profile'
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_TOKENS and not settings.PROFILER_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request) or not profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request)
+        finally:
+            profile_lock.release()
+
+    def should_profile(self, request):
+        token = request.META.get(self.header) or request.GET.get(self.query_param)
+        if token:
+            return token in settings.PROFILER_TOKENS
+        rate = settings.PROFILER_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def profile(self, request):
+        queries = []
+
+        def record_query(alias, sql, duration):
+            view, serializer = find_query_origin()
+            queries.append({
+                'alias': alias,
+                'sql': sql,
+                'duration_ms': round(duration * 1000, 3),
+                'view': view,
+                'serializer': serializer,
+            })
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler, such as a debugger or coverage, is active.
+            return self.get_response(request)
+        sampler = StackSampler(threading.get_ident(), settings.PROFILER_STACK_INTERVAL)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(QueryTimer(alias, record_query))
+                    )
+                sampler.start()
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+            sampler.stop()
+        elapsed = time.perf_counter() - start
+
+        profile_id = self.save(request, response, profiler, sampler, queries, elapsed)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def save(self, request, response, profiler, sampler, queries, elapsed):
+        output_dir = Path(settings.PROFILER_OUTPUT_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{slug}-{uuid.uuid4().hex[:8]}"
+
+        profiler.dump_stats(output_dir / f'{profile_id}.prof')
+        (output_dir / f'{profile_id}.collapsed').write_text(sampler.collapsed())
+        (output_dir / f'{profile_id}.sql.json').write_text(json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 3),
+            'query_count': len(queries),
+            'query_duration_ms': round(sum(q['duration_ms'] for q in queries), 3),
+            'queries': queries,
+        }, indent=2))
+        return profile_id
@@ -0,0 +1,27 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Successful stream responses bypass rendering entirely, so this only
+        # ever sees error payloads.
+        if data is None:
+            return b''
+        return f"event: error\ndata: {json.dumps(data)}\n\n".encode(self.charset)
+
+
+class ICalendarRenderer(BaseRenderer):
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Calendar feeds are streamed directly; only error payloads get here.
+        if data is None:
+            return b''
+        return json.dumps(data).encode(self.charset)
@@ -0,0 +1,135 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from datetime import date, timedelta
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from .models import Photographer, Assignment, ChangeLogEntry, whole_day
+
+# File layout (little endian):
+#   header   magic, format, data version, first day ordinal, days, photographers
+#   ids      int64 active photographer ids in assignment order (name, id)
+#   bitmaps  one row per day, bit i set when ids[i] has a booking that
+#            overlaps any part of that day
+HEADER = struct.Struct('<4sIQIII')
+MAGIC = b'RSTR'
+FORMAT = 1
+
+
+def current_version():
+    # Every tracked write appends to the change log, so its head identifies
+    # the state a snapshot was built from.
+    return ChangeLogEntry.objects.aggregate(head=Max('id'))['head'] or 0
+
+
+def build_snapshot(path, start=None, days=None):
+    start = start or date.today()
+    days = days or settings.ROSTER_HORIZON_DAYS
+
+    version = current_version()
+    photographer_ids = list(
+        Photographer.objects.filter(is_active=True).order_by('name', 'id').values_list('id', flat=True)
+    )
+    position = {photographer_id: i for i, photographer_id in enumerate(photographer_ids)}
+    row_bytes = (len(photographer_ids) + 7) // 8
+    bitmaps = bytearray(row_bytes * days)
+
+    window_start, window_end = whole_day(start, days)
+    bookings = Assignment.objects.filter(
+        starts_at__lt=window_end,
+        ends_at__gt=window_start
+    ).values_list('starts_at', 'ends_at', 'photographer_id').order_by()
+    for starts_at, ends_at, photographer_id in bookings.iterator(chunk_size=10000):
+        i = position.get(photographer_id)
+        if i is None:
+            continue
+        first = max((timezone.localdate(starts_at) - start).days, 0)
+        last = min((timezone.localdate(ends_at - timedelta(microseconds=1)) - start).days, days - 1)
+        for day in range(first, last + 1):
+            bitmaps[day * row_bytes + i // 8] |= 1 << (i % 8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.roster-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT, version, start.toordinal(), days, len(photographer_ids)))
+            f.write(array('q', photographer_ids).tobytes())
+            f.write(bitmaps)
+        # Readers keep their old mapping until they notice the new inode.
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return version
+
+
+class RosterSnapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, self.version, first_day, self.days, count = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC or fmt != FORMAT:
+            self.mmap.close()
+            raise ValueError(f'{path} is not a roster snapshot')
+        self.start = date.fromordinal(first_day)
+        self.row_bytes = (count + 7) // 8
+        ids_offset = HEADER.size
+        self.bitmap_offset = ids_offset + 8 * count
+        self.buffer = memoryview(self.mmap)
+        self.photographer_ids = self.buffer[ids_offset:self.bitmap_offset].cast('q')
+
+    def close(self):
+        self.photographer_ids.release()
+        self.buffer.release()
+        self.mmap.close()
+
+    def available(self, day, limit=None, last_day=None):
+        # Photographers with no booking on any day from day to last_day.
+        first = (day - self.start).days
+        last = (last_day - self.start).days if last_day is not None else first
+        if not 0 <= first <= last < self.days:
+            return None
+        rows = [self.bitmap_offset + index * self.row_bytes for index in range(first, last + 1)]
+        count = len(self.photographer_ids)
+        available = []
+        for byte_index in range(self.row_bytes):
+            booked = 0
+            for row in rows:
+                booked |= self.buffer[row + byte_index]
+            if booked == 0xFF:
+                continue
+            for bit in range(min(8, count - byte_index * 8)):
+                if not booked & (1 << bit):
+                    available.append(self.photographer_ids[byte_index * 8 + bit])
+                    if limit is not None and len(available) == limit:
+                        return available
+        return available
+
+
+_lock = threading.Lock()
+_loaded = {'key': None, 'snapshot': None}
+
+
+def get_snapshot():
+    path = settings.ROSTER_SNAPSHOT_PATH
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (str(path), stat.st_ino, stat.st_mtime_ns)
+    if _loaded['key'] == key:
+        return _loaded['snapshot']
+    with _lock:
+        if _loaded['key'] != key:
+            # The previous mapping may still be in use by another thread; it
+            # is unmapped once the last reference to it goes away.
+            _loaded['snapshot'] = RosterSnapshot(path)
+            _loaded['key'] = key
+    return _loaded['snapshot']
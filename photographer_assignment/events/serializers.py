@@ -1,5 +1,13 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Event, Photographer, Assignment
+from .models import Event, Photographer, Assignment, ArchivedEvent, ChangeLogEntry
+
+
+def prefetched_assignments(obj, related):
+    if 'assignments' in getattr(obj, '_prefetched_objects_cache', {}):
+        return obj.assignments.all()
+    return obj.assignments.select_related(related).all()
 
 
 class PhotographerSerializer(serializers.ModelSerializer):
@@ -26,14 +34,55 @@ class EventSerializer(serializers.ModelSerializer):
             'id',
             'event_name',
             'event_date',
+            'starts_at',
+            'ends_at',
             'photographers_required',
             'created_at',
             'assigned_photographers'
         ]
         read_only_fields = ['created_at']
 
+    def validate(self, attrs):
+        if 'starts_at' in attrs or 'ends_at' in attrs:
+            starts_at = attrs.get('starts_at', getattr(self.instance, 'starts_at', None))
+            ends_at = attrs.get('ends_at', getattr(self.instance, 'ends_at', None))
+            if starts_at is None or ends_at is None:
+                raise serializers.ValidationError(
+                    'starts_at and ends_at must be given together.'
+                )
+            if ends_at <= starts_at:
+                raise serializers.ValidationError(
+                    {'ends_at': 'ends_at must be after starts_at.'}
+                )
+            instance = self.instance
+            if instance is None or (starts_at, ends_at) != (instance.starts_at, instance.ends_at):
+                # A new interval decides the event date. An unchanged one, as
+                # echoed back by a PUT, leaves event_date free to move the
+                # event by whole days.
+                start_day = timezone.localdate(starts_at)
+                old_date = getattr(instance, 'event_date', None)
+                if attrs.get('event_date') not in (None, start_day, old_date):
+                    raise serializers.ValidationError(
+                        {'event_date': 'event_date must be the day starts_at falls on.'}
+                    )
+                attrs['event_date'] = start_day
+        elif self.instance is None and 'event_date' not in attrs:
+            raise serializers.ValidationError(
+                {'event_date': 'Give event_date for a whole-day event, or starts_at and ends_at.'}
+            )
+        return attrs
+
+    def update(self, instance, validated_data):
+        # Event.save() refuses moves that would double-book a photographer.
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(serializers.as_serializer_error(error))
+
     def get_assigned_photographers(self, obj):
-        assignments = obj.assignments.select_related('photographer').all()
+        assignments = self.context.get('assignments')
+        if assignments is None:
+            assignments = prefetched_assignments(obj, 'photographer')
         return PhotographerSerializer(
             [assignment.photographer for assignment in assignments],
             many=True
@@ -47,6 +96,8 @@ class EventListSerializer(serializers.ModelSerializer):
             'id',
             'event_name',
             'event_date',
+            'starts_at',
+            'ends_at',
             'photographers_required',
             'created_at'
         ]
@@ -60,8 +111,49 @@ class PhotographerScheduleSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'email', 'phone', 'is_active', 'assigned_events']
 
     def get_assigned_events(self, obj):
-        assignments = obj.assignments.select_related('event').all()
+        assignments = self.context.get('assignments')
+        if assignments is None:
+            assignments = prefetched_assignments(obj, 'event')
         return EventListSerializer(
             [assignment.event for assignment in assignments],
             many=True
         ).data
+
+
+class ArchivedEventListSerializer(serializers.ModelSerializer):
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedEvent
+        fields = [
+            'id',
+            'event_name',
+            'event_date',
+            'starts_at',
+            'ends_at',
+            'photographers_required',
+            'created_at',
+            'archived'
+        ]
+
+
+class ArchivedEventSerializer(ArchivedEventListSerializer):
+    assigned_photographers = serializers.SerializerMethodField()
+
+    class Meta(ArchivedEventListSerializer.Meta):
+        fields = ArchivedEventListSerializer.Meta.fields + ['assigned_photographers']
+
+    def get_assigned_photographers(self, obj):
+        assignments = prefetched_assignments(obj, 'photographer')
+        return PhotographerSerializer(
+            [assignment.photographer for assignment in assignments],
+            many=True
+        ).data
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    sequence = serializers.IntegerField(source='id', read_only=True)
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = ['sequence', 'model', 'object_id', 'action', 'data', 'created_at']
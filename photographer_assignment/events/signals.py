@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from . import forecast
+from .models import Event, Photographer, Assignment, ChangeLogEntry
+
+TRACKED_MODELS = (Event, Photographer, Assignment)
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = ChangeLogEntry.ACTION_INSERT if created else ChangeLogEntry.ACTION_UPDATE
+    ChangeLogEntry.record(instance, action)
+
+
+def log_delete(sender, instance, **kwargs):
+    ChangeLogEntry.record(instance, ChangeLogEntry.ACTION_DELETE)
+
+
+# Connected per model rather than globally so models that are not tracked
+# (the change log itself included) keep Django's fast-delete path.
+for model in TRACKED_MODELS:
+    post_save.connect(log_save, sender=model, dispatch_uid=f'changelog_save_{model.__name__}')
+    post_delete.connect(log_delete, sender=model, dispatch_uid=f'changelog_delete_{model.__name__}')
+
+
+def invalidate_event_forecast(sender, instance, created=False, **kwargs):
+    if not created and instance._loaded_event_date is None:
+        # Instances from bulk_create() do not know their stored dates.
+        forecast.invalidate_all()
+    else:
+        forecast.invalidate_spans(
+            (instance.event_date, instance.last_date),
+            (instance._loaded_event_date, instance._loaded_last_date)
+        )
+
+
+def invalidate_assignment_forecast(sender, instance, **kwargs):
+    forecast.invalidate_spans((instance.event_date, instance.last_date))
+
+
+def invalidate_photographer_forecast(sender, instance, **kwargs):
+    forecast.invalidate_all()
+
+
+for model, receiver in (
+    (Event, invalidate_event_forecast),
+    (Assignment, invalidate_assignment_forecast),
+    (Photographer, invalidate_photographer_forecast),
+):
+    post_save.connect(receiver, sender=model, dispatch_uid=f'forecast_save_{model.__name__}')
+    post_delete.connect(receiver, sender=model, dispatch_uid=f'forecast_delete_{model.__name__}')
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from ..models import Event, Photographer, Assignment, whole_day
+
+# Fixture builders for setUpTestData. Each is a single bulk_create, so
+# save() and the signal receivers do not run: nothing is written to the
+# change log and the forecast cache is not touched. Tests that depend on
+# either create their rows with objects.create() instead.
+
+
+def make_photographers(count, inactive=(), name='Photographer {index:02d}'):
+    return Photographer.objects.bulk_create([
+        Photographer(
+            name=name.format(index=i),
+            email=f'photo{i}@example.com',
+            phone=f'+{i:010d}',
+            is_active=i not in inactive
+        )
+        for i in range(count)
+    ])
+
+
+def make_events(offsets, photographers_required=1, name='Event {offset}', days=1):
+    today = date.today()
+    events = []
+    for i, offset in enumerate(offsets):
+        event_date = today + timedelta(days=offset)
+        starts_at, ends_at = whole_day(event_date, days)
+        events.append(Event(
+            event_name=name.format(index=i, offset=offset),
+            event_date=event_date,
+            last_date=event_date + timedelta(days=days - 1),
+            starts_at=starts_at,
+            ends_at=ends_at,
+            photographers_required=photographers_required
+        ))
+    return Event.objects.bulk_create(events)
+
+
+def make_assignments(pairs):
+    # Assignment.save() normally copies the event's dates and interval across.
+    return Assignment.objects.bulk_create([
+        Assignment(
+            event=event,
+            photographer=photographer,
+            event_date=event.event_date,
+            last_date=event.last_date,
+            starts_at=event.starts_at,
+            ends_at=event.ends_at
+        )
+        for event, photographer in pairs
+    ])
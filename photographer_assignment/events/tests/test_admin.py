@@ -0,0 +1,109 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from datetime import date, timedelta
+from unittest import mock
+from ..models import Event, Photographer, Assignment, ChangeLogEntry
+from .factories import make_assignments, make_events, make_photographers
+
+
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.photographers = make_photographers(5)
+        make_assignments(zip(make_events(range(1, 6)), cls.photographers))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_assignment_changelist_query_count_is_constant(self):
+        url = reverse('admin:events_assignment_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+
+        event = Event.objects.create(
+            event_name='Extra Event',
+            event_date=date.today() + timedelta(days=30),
+            photographers_required=5
+        )
+        for photographer in self.photographers:
+            Assignment.objects.create(event=event, photographer=photographer)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+
+    def test_assignment_date_drilldown_uses_denormalised_date(self):
+        response = self.client.get(reverse('admin:events_assignment_changelist'))
+        self.assertContains(response, '?event_date__year=')
+        self.assertNotContains(response, 'event__event_date')
+
+        day = date.today() + timedelta(days=1)
+        response = self.client.get(
+            reverse('admin:events_assignment_changelist'),
+            {'event_date__year': day.year, 'event_date__month': day.month, 'event_date__day': day.day}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_mark_inactive_action(self):
+        response = self.client.post(
+            reverse('admin:events_photographer_changelist'),
+            {
+                'action': 'mark_inactive',
+                '_selected_action': [p.id for p in self.photographers[:2]],
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(Photographer.objects.filter(is_active=False).count(), 2)
+
+    def test_unassign_selected_action(self):
+        ids = list(Assignment.objects.values_list('id', flat=True)[:3])
+        response = self.client.post(
+            reverse('admin:events_assignment_changelist'),
+            {'action': 'unassign_selected', '_selected_action': ids}
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(Assignment.objects.count(), 2)
+
+    @mock.patch('events.admin.ACTION_CHUNK_SIZE', 2)
+    def test_actions_on_select_all_work_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('admin:events_photographer_changelist'),
+                {
+                    'action': 'mark_inactive',
+                    'select_across': '1',
+                    '_selected_action': [self.photographers[0].id],
+                }
+            )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertFalse(Photographer.objects.filter(is_active=True).exists())
+        self.assertEqual(ChangeLogEntry.objects.filter(model='photographer').count(), 5)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "events_photographer"')]
+        self.assertEqual(len(updates), 3)
+
+        response = self.client.post(
+            reverse('admin:events_assignment_changelist'),
+            {
+                'action': 'unassign_selected',
+                'select_across': '1',
+                '_selected_action': [Assignment.objects.first().id],
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertFalse(Assignment.objects.exists())
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(model='assignment', action=ChangeLogEntry.ACTION_DELETE).count(),
+            5
+        )
+
+    def test_autocomplete_widgets_on_assignment_form(self):
+        response = self.client.get(reverse('admin:events_assignment_add'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'admin-autocomplete')
@@ -1,78 +1,24 @@
-from django.test import TestCase
-from django.urls import reverse
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, get_resolver, reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework.settings import api_settings
 from datetime import date, timedelta
-from .models import Event, Photographer, Assignment
-
-
-class PhotographerModelTest(TestCase):
-    def setUp(self):
-        self.photographer = Photographer.objects.create(
-            name='Test Photographer',
-            email='test@example.com',
-            phone='+1234567890',
-            is_active=True
-        )
-
-    def test_photographer_creation(self):
-        self.assertEqual(self.photographer.name, 'Test Photographer')
-        self.assertEqual(self.photographer.email, 'test@example.com')
-        self.assertTrue(self.photographer.is_active)
-
-    def test_photographer_str(self):
-        self.assertEqual(str(self.photographer), 'Test Photographer')
-
-
-class EventModelTest(TestCase):
-    def setUp(self):
-        self.event = Event.objects.create(
-            event_name='Test Event',
-            event_date=date.today() + timedelta(days=10),
-            photographers_required=2
-        )
-
-    def test_event_creation(self):
-        self.assertEqual(self.event.event_name, 'Test Event')
-        self.assertEqual(self.event.photographers_required, 2)
-
-    def test_event_str(self):
-        expected = f"Test Event on {self.event.event_date}"
-        self.assertEqual(str(self.event), expected)
-
-
-class AssignmentModelTest(TestCase):
-    def setUp(self):
-        self.photographer = Photographer.objects.create(
-            name='Test Photographer',
-            email='test@example.com',
-            phone='+1234567890'
-        )
-        self.event = Event.objects.create(
-            event_name='Test Event',
-            event_date=date.today() + timedelta(days=10),
-            photographers_required=1
-        )
-        self.assignment = Assignment.objects.create(
-            event=self.event,
-            photographer=self.photographer
-        )
-
-    def test_assignment_creation(self):
-        self.assertEqual(self.assignment.event, self.event)
-        self.assertEqual(self.assignment.photographer, self.photographer)
-
-    def test_assignment_unique_constraint(self):
-        with self.assertRaises(Exception):
-            Assignment.objects.create(
-                event=self.event,
-                photographer=self.photographer
-            )
+from photographer_system import settings_api
+from photographer_system.warmup import warm_up
+from ..ical import escape, fold
+from ..models import Event, Photographer, Assignment
+from .factories import make_assignments, make_events, make_photographers
 
 
 class PhotographerAPITest(APITestCase):
-    def setUp(self):
-        self.photographer_data = {
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer_data = {
             'name': 'John Doe',
             'email': 'john@example.com',
             'phone': '+1234567890',
@@ -141,8 +87,9 @@ class PhotographerAPITest(APITestCase):
 
 
 class EventAPITest(APITestCase):
-    def setUp(self):
-        self.event_data = {
+    @classmethod
+    def setUpTestData(cls):
+        cls.event_data = {
             'event_name': 'Corporate Event',
             'event_date': (date.today() + timedelta(days=30)).isoformat(),
             'photographers_required': 2
@@ -228,141 +175,6 @@ class EventAPITest(APITestCase):
         self.assertEqual(len(response.data), 1)
 
 
-class AssignmentLogicTest(APITestCase):
-    def setUp(self):
-        self.photographer1 = Photographer.objects.create(
-            name='Photographer 1',
-            email='photo1@example.com',
-            phone='+1111111111',
-            is_active=True
-        )
-        self.photographer2 = Photographer.objects.create(
-            name='Photographer 2',
-            email='photo2@example.com',
-            phone='+2222222222',
-            is_active=True
-        )
-        self.photographer3 = Photographer.objects.create(
-            name='Photographer 3',
-            email='photo3@example.com',
-            phone='+3333333333',
-            is_active=False
-        )
-        self.event = Event.objects.create(
-            event_name='Wedding',
-            event_date=date.today() + timedelta(days=30),
-            photographers_required=2
-        )
-
-    def test_successful_assignment(self):
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[self.event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(Assignment.objects.count(), 2)
-        self.assertIn('message', response.data)
-        self.assertEqual(len(response.data['assigned_photographers']), 2)
-
-    def test_assignment_excludes_inactive_photographers(self):
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[self.event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        assigned_ids = [p['id'] for p in response.data['assigned_photographers']]
-        self.assertNotIn(self.photographer3.id, assigned_ids)
-
-    def test_insufficient_photographers(self):
-        event = Event.objects.create(
-            event_name='Large Event',
-            event_date=date.today() + timedelta(days=40),
-            photographers_required=5
-        )
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('error', response.data)
-        self.assertEqual(response.data['required'], 5)
-        self.assertEqual(response.data['available'], 2)
-
-    def test_past_event_assignment(self):
-        past_event = Event.objects.create(
-            event_name='Past Event',
-            event_date=date.today() - timedelta(days=10),
-            photographers_required=1
-        )
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[past_event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Cannot assign photographers to past events', response.data['error'])
-
-    def test_already_assigned_event(self):
-        Assignment.objects.create(event=self.event, photographer=self.photographer1)
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[self.event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('already assigned', response.data['error'])
-        self.assertEqual(response.data['assigned_count'], 1)
-
-    def test_invalid_photographers_required(self):
-        invalid_event = Event.objects.create(
-            event_name='Invalid Event',
-            event_date=date.today() + timedelta(days=20),
-            photographers_required=1
-        )
-        invalid_event.photographers_required = 0
-        invalid_event.save()
-        
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[invalid_event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-
-    def test_date_conflict_prevention(self):
-        event_date = date.today() + timedelta(days=50)
-        event1 = Event.objects.create(
-            event_name='Event 1',
-            event_date=event_date,
-            photographers_required=1
-        )
-        event2 = Event.objects.create(
-            event_name='Event 2',
-            event_date=event_date,
-            photographers_required=1
-        )
-        
-        response1 = self.client.post(
-            reverse('event-assign-photographers', args=[event1.id])
-        )
-        self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
-        
-        response2 = self.client.post(
-            reverse('event-assign-photographers', args=[event2.id])
-        )
-        self.assertEqual(response2.status_code, status.HTTP_201_CREATED)
-        
-        assigned_to_event1 = set(
-            Assignment.objects.filter(event=event1).values_list('photographer_id', flat=True)
-        )
-        assigned_to_event2 = set(
-            Assignment.objects.filter(event=event2).values_list('photographer_id', flat=True)
-        )
-        
-        self.assertEqual(len(assigned_to_event1.intersection(assigned_to_event2)), 0)
-
-    def test_exact_number_of_photographers_assigned(self):
-        response = self.client.post(
-            reverse('event-assign-photographers', args=[self.event.id])
-        )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(
-            Assignment.objects.filter(event=self.event).count(),
-            self.event.photographers_required
-        )
-
-
 class EdgeCaseTest(APITestCase):
     def test_create_photographer_duplicate_email(self):
         Photographer.objects.create(
@@ -400,4 +212,198 @@ class EdgeCaseTest(APITestCase):
         self.assertEqual(
             response.data['assigned_photographers'][0]['name'],
             'Test Photographer'
-        )
\ No newline at end of file
+        )
+
+
+@override_settings(
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+)
+class ApiProfileTest(APITestCase):
+    def test_json_requests_work_without_session_middleware(self):
+        response = self.client.post(
+            reverse('photographer-list'),
+            {'name': 'John Doe', 'email': 'john@example.com', 'phone': '+1234567890'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_admin_is_not_routed(self):
+        response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_browsable_api_is_not_rendered(self):
+        # Views bind their renderer classes at import time, so this needs a
+        # fresh process started with the API profile.
+        script = (
+            'import django; django.setup()\n'
+            'from django.test import Client\n'
+            "response = Client().get('/api/events/', HTTP_ACCEPT='text/html')\n"
+            "print(response.status_code, response['Content-Type'])\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'photographer_system.settings_api'},
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        status_code, content_type = result.stdout.split(maxsplit=1)
+        self.assertEqual(int(status_code), status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertNotIn('text/html', content_type)
+
+    def test_warm_up(self):
+        clear_url_caches()
+        api_settings.reload()
+        Event._meta._expire_cache()
+
+        warm_up()
+        self.assertTrue(get_resolver()._populated)
+        self.assertIn('_relation_tree', Event._meta.__dict__)
+        self.assertIn('DEFAULT_RENDERER_CLASSES', api_settings._cached_attrs)
+
+
+class BatchReadTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographers = make_photographers(4)
+        cls.events = make_events(range(1, 5), photographers_required=2)
+        make_assignments(
+            (event, cls.photographers[(i + shift) % 4])
+            for i, event in enumerate(cls.events)
+            for shift in (0, 1)
+        )
+
+    def test_event_batch_is_keyed_by_id(self):
+        ids = [self.events[0].id, self.events[2].id, 999999]
+        response = self.client.get(
+            reverse('event-batch'),
+            {'ids': ','.join(str(i) for i in ids)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(response.data['results']),
+            [str(self.events[0].id), str(self.events[2].id)]
+        )
+        self.assertEqual(response.data['missing'], [999999])
+        event = response.data['results'][str(self.events[0].id)]
+        self.assertEqual(len(event['assigned_photographers']), 2)
+
+    def test_event_batch_query_count_is_constant(self):
+        ids = ','.join(str(event.id) for event in self.events)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('event-batch'), {'ids': ids})
+
+    def test_schedule_batch(self):
+        ids = ','.join(str(p.id) for p in self.photographers)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('photographer-schedules'), {'ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 4)
+        for schedule in response.data['results'].values():
+            self.assertEqual(len(schedule['assigned_events']), 2)
+
+    def test_invalid_ids(self):
+        response = self.client.get(reverse('event-batch'), {'ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('event-batch'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BATCH_MAX_IDS=2)
+    def test_too_many_ids(self):
+        response = self.client.get(reverse('photographer-schedules'), {'ids': '1,2,3'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['max'], 2)
+
+
+class ScheduleWindowTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer = Photographer.objects.create(
+            name='Test Photographer',
+            email='test@example.com',
+            phone='+1234567890'
+        )
+        cls.events = make_events((-20, -5, 3, 10, 40))
+        make_assignments((event, cls.photographer) for event in cls.events)
+        cls.url = reverse('photographer-schedule', args=[cls.photographer.id])
+
+    def test_unfiltered_schedule_is_unchanged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['assigned_events']), 5)
+        self.assertNotIn('next_cursor', response.data)
+
+    def test_upcoming_only(self):
+        response = self.client.get(self.url, {'upcoming': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [e['event_name'] for e in response.data['assigned_events']],
+            ['Event 3', 'Event 10', 'Event 40']
+        )
+
+    def test_date_window(self):
+        response = self.client.get(self.url, {
+            'from': (date.today() - timedelta(days=10)).isoformat(),
+            'to': (date.today() + timedelta(days=10)).isoformat(),
+        })
+        self.assertEqual(
+            [e['event_name'] for e in response.data['assigned_events']],
+            ['Event -5', 'Event 3', 'Event 10']
+        )
+
+    def test_invalid_window(self):
+        response = self.client.get(self.url, {'from': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'from': '2030-01-02', 'to': '2030-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pagination_follows_cursor(self):
+        names = []
+        params = {'limit': 2}
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(e['event_name'] for e in response.data['assigned_events'])
+            if response.data['next_cursor'] is None:
+                break
+            params = {'limit': 2, 'cursor': response.data['next_cursor']}
+        self.assertEqual(names, ['Event -20', 'Event -5', 'Event 3', 'Event 10', 'Event 40'])
+
+    def test_assignment_date_follows_event_date(self):
+        event = self.events[0]
+        event.event_date = date.today() + timedelta(days=100)
+        event.save()
+        self.assertEqual(
+            Assignment.objects.get(event=event).event_date,
+            event.event_date
+        )
+
+    def test_calendar_feed(self):
+        response = self.client.get(
+            reverse('photographer-calendar', args=[self.photographer.id]),
+            {'upcoming': '1'},
+            HTTP_ACCEPT='text/calendar'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        self.assertIn('SUMMARY:Event 40\r\n', body)
+
+
+class ICalendarTest(TestCase):
+    def test_escape(self):
+        self.assertEqual(escape('a,b;c\\d\ne'), 'a\\,b\\;c\\\\d\\ne')
+
+    def test_fold_long_lines(self):
+        line = 'SUMMARY:' + 'x' * 200
+        folded = fold(line)
+        self.assertTrue(all(
+            len(part.encode()) <= 75 for part in folded.rstrip('\r\n').split('\r\n')
+        ))
+        self.assertEqual(folded.replace('\r\n ', '').rstrip('\r\n'), line)
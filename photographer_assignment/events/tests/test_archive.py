@@ -0,0 +1,161 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..models import (
+    Event,
+    Photographer,
+    Assignment,
+    ArchivedEvent,
+    ArchivedAssignment,
+    ChangeLogEntry,
+    whole_day
+)
+from ..admin import estimated_row_count
+from ..assignment import free_photographers
+from .factories import make_assignments, make_events
+
+
+class ArchiveTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer = Photographer.objects.create(
+            name='Test Photographer',
+            email='test@example.com',
+            phone='+1234567890'
+        )
+        cls.old_events = make_events((-400, -401, -402), name='Old Event {index}')
+        [cls.recent_event] = make_events([-10], name='Recent Event')
+        make_assignments((event, cls.photographer) for event in cls.old_events + [cls.recent_event])
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_events', stdout=out, **options)
+        return out.getvalue()
+
+    def test_moves_old_events_and_assignments_in_batches(self):
+        output = self.archive(days=365, batch_size=2)
+        self.assertIn('Archived 3 events and 3 assignments', output)
+        self.assertEqual(list(Event.objects.values_list('id', flat=True)), [self.recent_event.id])
+        self.assertEqual(Assignment.objects.count(), 1)
+        self.assertEqual(
+            sorted(ArchivedEvent.objects.values_list('id', flat=True)),
+            sorted(event.id for event in self.old_events)
+        )
+        self.assertEqual(ArchivedAssignment.objects.count(), 3)
+
+    def test_archiving_is_not_logged_as_deletes(self):
+        self.archive(days=365)
+        self.assertFalse(ChangeLogEntry.objects.filter(action='delete').exists())
+
+    def test_archiving_refreshes_row_estimates(self):
+        make_events([5, 6], name='Multi-day {index}', days=2)
+        self.archive(days=365)
+        self.assertEqual(estimated_row_count(Event), 3)
+        self.assertEqual(estimated_row_count(ArchivedEvent), 3)
+
+    def test_rerun_is_a_no_op(self):
+        self.archive(days=365)
+        self.assertIn('Archived 0 events', self.archive(days=365))
+
+    def test_events_still_running_are_not_archived(self):
+        [festival] = make_events([-1], name='Festival', days=3)
+        make_assignments([(festival, self.photographer)])
+        tomorrow = whole_day(date.today() + timedelta(days=1))
+        self.assertEqual(free_photographers(*tomorrow).count(), 0)
+
+        self.archive(days=0)
+        self.assertTrue(Event.objects.filter(id=festival.id).exists())
+        self.assertFalse(ArchivedEvent.objects.filter(id=festival.id).exists())
+        self.assertEqual(free_photographers(*tomorrow).count(), 0)
+
+    def test_future_cutoff_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.archive(before=(date.today() + timedelta(days=1)).isoformat())
+        with self.assertRaises(CommandError):
+            self.archive(days=-30)
+        self.assertEqual(ArchivedEvent.objects.count(), 0)
+
+    def test_list_and_retrieve_include_archived_on_request(self):
+        self.archive(days=365)
+        response = self.client.get(reverse('event-list'))
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get(reverse('event-list'), {
+            'include_archived': 'true',
+            'from': (date.today() - timedelta(days=401)).isoformat(),
+            'to': (date.today() - timedelta(days=300)).isoformat(),
+        })
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(
+            sorted(e['event_name'] for e in response.data if e.get('archived')),
+            ['Old Event 0', 'Old Event 1']
+        )
+
+        url = reverse('event-detail', args=[self.old_events[0].id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['archived'])
+        self.assertEqual(response.data['assigned_photographers'][0]['name'], 'Test Photographer')
+
+    def test_archived_multi_day_events_are_listed_in_windows_they_run_into(self):
+        [fair] = make_events([-420], name='Fair', days=5)
+        make_assignments([(fair, self.photographer)])
+        self.archive(days=365)
+        self.assertEqual(ArchivedEvent.objects.get(id=fair.id).last_date, fair.last_date)
+
+        def archived_names(start, end):
+            response = self.client.get(reverse('event-list'), {
+                'include_archived': 'true',
+                'from': (date.today() + timedelta(days=start)).isoformat(),
+                'to': (date.today() + timedelta(days=end)).isoformat(),
+            })
+            return sorted(e['event_name'] for e in response.data if e.get('archived'))
+
+        self.assertEqual(archived_names(-416, -402), ['Fair', 'Old Event 2'])
+        self.assertEqual(archived_names(-415, -402), ['Old Event 2'])
+
+        url = reverse('photographer-schedule', args=[self.photographer.id])
+        response = self.client.get(url, {
+            'include_archived': '1',
+            'from': (date.today() - timedelta(days=416)).isoformat(),
+            'to': (date.today() - timedelta(days=402)).isoformat(),
+        })
+        self.assertEqual(
+            [e['event_name'] for e in response.data['assigned_events']],
+            ['Fair', 'Old Event 2']
+        )
+
+    def test_list_include_archived_requires_a_bounded_window(self):
+        self.archive(days=365)
+        today = date.today()
+        for params in (
+            {},
+            {'from': today.isoformat()},
+            {'from': (today - timedelta(days=366)).isoformat(), 'to': today.isoformat()},
+        ):
+            response = self.client.get(reverse('event-list'), {'include_archived': 'true', **params})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_schedule_includes_archived_on_request(self):
+        self.archive(days=365)
+        url = reverse('photographer-schedule', args=[self.photographer.id])
+        self.assertEqual(len(self.client.get(url).data['assigned_events']), 1)
+
+        response = self.client.get(url, {'include_archived': '1'})
+        self.assertEqual(len(response.data['assigned_events']), 4)
+
+        response = self.client.get(url, {
+            'include_archived': '1',
+            'from': (date.today() - timedelta(days=401)).isoformat(),
+        })
+        self.assertEqual(
+            [e['event_name'] for e in response.data['assigned_events']],
+            ['Old Event 1', 'Old Event 0', 'Recent Event']
+        )
+
+        response = self.client.get(url, {'include_archived': '1', 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,229 @@
+import threading
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..assignment import AssignmentError, assign_available_photographers
+from ..models import Event, Assignment, ChangeLogEntry
+from .factories import make_events, make_photographers
+
+
+class AssignmentLogicTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer1, cls.photographer2, cls.photographer3 = make_photographers(3, inactive={2})
+        cls.event = Event.objects.create(
+            event_name='Wedding',
+            event_date=date.today() + timedelta(days=30),
+            photographers_required=2
+        )
+
+    def test_successful_assignment(self):
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[self.event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Assignment.objects.count(), 2)
+        self.assertIn('message', response.data)
+        self.assertEqual(len(response.data['assigned_photographers']), 2)
+
+    def test_assignment_excludes_inactive_photographers(self):
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[self.event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        assigned_ids = [p['id'] for p in response.data['assigned_photographers']]
+        self.assertNotIn(self.photographer3.id, assigned_ids)
+
+    def test_insufficient_photographers(self):
+        event = Event.objects.create(
+            event_name='Large Event',
+            event_date=date.today() + timedelta(days=40),
+            photographers_required=5
+        )
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+        self.assertEqual(response.data['required'], 5)
+        self.assertEqual(response.data['available'], 2)
+
+    def test_past_event_assignment(self):
+        past_event = Event.objects.create(
+            event_name='Past Event',
+            event_date=date.today() - timedelta(days=10),
+            photographers_required=1
+        )
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[past_event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Cannot assign photographers to past events', response.data['error'])
+
+    def test_already_assigned_event(self):
+        Assignment.objects.create(event=self.event, photographer=self.photographer1)
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[self.event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('already assigned', response.data['error'])
+        self.assertEqual(response.data['assigned_count'], 1)
+
+    def test_invalid_photographers_required(self):
+        invalid_event = Event.objects.create(
+            event_name='Invalid Event',
+            event_date=date.today() + timedelta(days=20),
+            photographers_required=1
+        )
+        invalid_event.photographers_required = 0
+        invalid_event.save()
+        
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[invalid_event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_date_conflict_prevention(self):
+        event_date = date.today() + timedelta(days=50)
+        event1 = Event.objects.create(
+            event_name='Event 1',
+            event_date=event_date,
+            photographers_required=1
+        )
+        event2 = Event.objects.create(
+            event_name='Event 2',
+            event_date=event_date,
+            photographers_required=1
+        )
+        
+        response1 = self.client.post(
+            reverse('event-assign-photographers', args=[event1.id])
+        )
+        self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
+        
+        response2 = self.client.post(
+            reverse('event-assign-photographers', args=[event2.id])
+        )
+        self.assertEqual(response2.status_code, status.HTTP_201_CREATED)
+        
+        assigned_to_event1 = set(
+            Assignment.objects.filter(event=event1).values_list('photographer_id', flat=True)
+        )
+        assigned_to_event2 = set(
+            Assignment.objects.filter(event=event2).values_list('photographer_id', flat=True)
+        )
+        
+        self.assertEqual(len(assigned_to_event1.intersection(assigned_to_event2)), 0)
+
+    def test_exact_number_of_photographers_assigned(self):
+        response = self.client.post(
+            reverse('event-assign-photographers', args=[self.event.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Assignment.objects.filter(event=self.event).count(),
+            self.event.photographers_required
+        )
+
+
+class CreateAndStaffTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_photographers(2)
+        cls.url = reverse('event-list') + '?assign=true'
+
+    def event_data(self, required, days=30):
+        return {
+            'event_name': 'Wedding',
+            'event_date': (date.today() + timedelta(days=days)).isoformat(),
+            'photographers_required': required
+        }
+
+    def test_creates_and_staffs_event(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.event_data(2), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['assigned_photographers']), 2)
+        event = Event.objects.get()
+        self.assertEqual(Assignment.objects.filter(event=event).count(), 2)
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(model='assignment', action='insert').count(),
+            2
+        )
+        self.assertFalse(any(
+            'FROM "events_assignment" INNER JOIN "events_photographer"' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_staffing_failure_rolls_back_event(self):
+        response = self.client.post(self.url, self.event_data(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['required'], 3)
+        self.assertEqual(response.data['available'], 2)
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(ChangeLogEntry.objects.filter(model='event').exists())
+
+    def test_past_event_rolls_back(self):
+        response = self.client.post(self.url, self.event_data(1, days=-1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Event.objects.exists())
+
+    def test_invalid_event_is_rejected_before_staffing(self):
+        response = self.client.post(self.url, self.event_data(0), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('photographers_required', response.data)
+
+    def test_plain_create_does_not_staff(self):
+        response = self.client.post(reverse('event-list'), self.event_data(1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Assignment.objects.exists())
+
+
+class ConcurrentAssignmentTest(TransactionTestCase):
+    # Each thread gets its own connection to the file-backed test database,
+    # so these runs go through SQLite's real locking rather than a shared
+    # in-memory cache.
+    def setUp(self):
+        make_photographers(8)
+
+    def assign_concurrently(self, events):
+        barrier = threading.Barrier(len(events))
+        errors = []
+
+        def assign(event):
+            try:
+                barrier.wait()
+                assign_available_photographers(event)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=assign, args=(event,)) for event in events]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_test_database_is_file_backed(self):
+        self.assertFalse(connection.is_in_memory_db())
+
+    def test_same_day_requests_do_not_double_book(self):
+        events = make_events([30] * 4, photographers_required=2, name='Event {index}')
+        self.assertEqual(self.assign_concurrently(events), [])
+        booked = list(Assignment.objects.values_list('photographer_id', flat=True))
+        self.assertEqual(len(booked), 8)
+        self.assertEqual(len(set(booked)), 8)
+
+    def test_requests_beyond_capacity_fail_cleanly(self):
+        events = make_events([30] * 5, photographers_required=2, name='Event {index}')
+        errors = self.assign_concurrently(events)
+        self.assertEqual([type(error) for error in errors], [AssignmentError])
+        self.assertEqual(errors[0].payload['available'], 0)
+        booked = list(Assignment.objects.values_list('photographer_id', flat=True))
+        self.assertEqual(len(booked), len(set(booked)))
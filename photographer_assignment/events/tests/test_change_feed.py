@@ -0,0 +1,112 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..models import Event, Photographer, Assignment, ChangeLogEntry
+
+
+class ChangeFeedTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Created one at a time, not with the factories: the change log
+        # entries written by the signals are part of the fixture here.
+        cls.photographer = Photographer.objects.create(
+            name='Test Photographer',
+            email='test@example.com',
+            phone='+1234567890'
+        )
+        cls.event = Event.objects.create(
+            event_name='Test Event',
+            event_date=date.today() + timedelta(days=10),
+            photographers_required=1
+        )
+
+    def test_inserts_updates_and_deletes_are_logged_in_order(self):
+        assignment = Assignment.objects.create(event=self.event, photographer=self.photographer)
+        self.event.event_name = 'Renamed Event'
+        self.event.save()
+        assignment.delete()
+
+        entries = list(ChangeLogEntry.objects.values_list('model', 'action'))
+        self.assertEqual(entries, [
+            ('photographer', 'insert'),
+            ('event', 'insert'),
+            ('assignment', 'insert'),
+            ('event', 'update'),
+            ('assignment', 'delete'),
+        ])
+        self.assertEqual(
+            ChangeLogEntry.objects.get(model='event', action='update').data['event_name'],
+            'Renamed Event'
+        )
+
+    def test_since_returns_only_deltas(self):
+        response = self.client.get(reverse('change-list'))
+        cursor = response.data['cursor']
+        self.assertEqual(len(response.data['results']), 2)
+
+        Assignment.objects.create(event=self.event, photographer=self.photographer)
+        response = self.client.get(reverse('change-list'), {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['model'], 'assignment')
+        self.assertGreater(response.data['cursor'], cursor)
+        self.assertFalse(response.data['has_more'])
+
+    def test_limit_sets_has_more(self):
+        response = self.client.get(reverse('change-list'), {'limit': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertTrue(response.data['has_more'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('change-list'), {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pruned_cursor_requires_resync(self):
+        first_id = ChangeLogEntry.objects.first().id
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=30))
+        Photographer.objects.create(name='New', email='new@example.com', phone='+1')
+        call_command('prune_change_log', days=7, stdout=StringIO())
+        self.assertEqual(ChangeLogEntry.objects.count(), 1)
+
+        response = self.client.get(reverse('change-list'), {'since': first_id})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_prune_keeps_the_newest_entry(self):
+        Photographer.objects.create(name='New', email='new@example.com', phone='+1')
+        first_id, _, cursor = ChangeLogEntry.objects.values_list('id', flat=True)
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=30))
+        call_command('prune_change_log', days=7, stdout=StringIO())
+        self.assertEqual(list(ChangeLogEntry.objects.values_list('id', flat=True)), [cursor])
+
+        response = self.client.get(reverse('change-list'), {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(reverse('change-list'), {'since': first_id})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_empty_log_rejects_issued_cursors(self):
+        ChangeLogEntry.objects.all().delete()
+        response = self.client.get(reverse('change-list'), {'since': 1})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        response = self.client.get(reverse('change-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(CHANGE_FEED_STREAM_MAX_SECONDS=0)
+    def test_event_stream(self):
+        first, second = ChangeLogEntry.objects.values_list('id', flat=True)
+        response = self.client.get(
+            reverse('change-stream'),
+            HTTP_ACCEPT='text/event-stream',
+            HTTP_LAST_EVENT_ID=str(first)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: insert', body)
+        self.assertNotIn(f'id: {first}\n', body)
+        self.assertIn(f'id: {second}\n', body)
@@ -0,0 +1,77 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..forecast import capacity_forecast
+from ..models import Assignment
+from .factories import make_assignments, make_events, make_photographers
+
+
+class CapacityForecastTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographers = make_photographers(4, inactive={3})
+        cls.day = date.today() + timedelta(days=5)
+        cls.busy_event, _ = make_events([5, 5], photographers_required=2, name='Event {index}')
+        make_events([40], name='Birthday')
+        make_assignments([(cls.busy_event, cls.photographers[0])])
+
+    def setUp(self):
+        # The cache is per process, so this is safe under --parallel.
+        cache.clear()
+
+    def forecast_for(self, day):
+        report = capacity_forecast(date.today(), date.today() + timedelta(days=90))
+        return next(d for d in report['dates'] if d['date'] == day.isoformat())
+
+    def test_figures_per_date(self):
+        figures = self.forecast_for(self.day)
+        self.assertEqual(figures['events'], 2)
+        self.assertEqual(figures['required'], 4)
+        self.assertEqual(figures['booked'], 1)
+        self.assertEqual(figures['unfilled'], 3)
+        self.assertEqual(figures['free'], 2)
+        self.assertEqual(figures['shortfall'], 1)
+
+    def test_forecast_is_cached(self):
+        capacity_forecast(date.today(), date.today() + timedelta(days=730))
+        with self.assertNumQueries(0):
+            capacity_forecast(date.today(), date.today() + timedelta(days=730))
+
+    def test_assignment_changes_invalidate_forecast(self):
+        self.forecast_for(self.day)
+        Assignment.objects.create(event=self.busy_event, photographer=self.photographers[1])
+        self.assertEqual(self.forecast_for(self.day)['booked'], 2)
+
+    def test_event_date_change_invalidates_both_dates(self):
+        new_day = date.today() + timedelta(days=60)
+        self.forecast_for(self.day)
+        self.busy_event.event_date = new_day
+        self.busy_event.save()
+        self.assertEqual(self.forecast_for(self.day)['required'], 2)
+        self.assertEqual(self.forecast_for(new_day)['booked'], 1)
+
+    def test_photographer_changes_invalidate_forecast(self):
+        self.forecast_for(self.day)
+        self.photographers[3].is_active = True
+        self.photographers[3].save()
+        self.assertEqual(self.forecast_for(self.day)['free'], 3)
+
+    def test_endpoint_flags_shortfalls(self):
+        response = self.client.get(reverse('capacity-forecast-list'), {'shortfall_only': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['shortfall_dates'], [self.day.isoformat()])
+        self.assertEqual(len(response.data['dates']), 1)
+
+    def test_endpoint_rejects_long_horizon(self):
+        response = self.client.get(reverse('capacity-forecast-list'), {'days': 10000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('capacity_forecast', days=90, stdout=out)
+        self.assertIn(self.day.isoformat(), out.getvalue())
+        self.assertIn('1 date(s) short of photographers', out.getvalue())
@@ -0,0 +1,322 @@
+import os
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..assignment import free_photographers
+from ..forecast import capacity_forecast
+from ..models import Event, Photographer, Assignment, ChangeLogEntry, whole_day
+from ..roster import build_snapshot, get_snapshot
+from .factories import make_events, make_photographers
+
+
+class EventIntervalTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographers = make_photographers(4)
+        cls.day = date.today() + timedelta(days=20)
+        cls.midnight = whole_day(cls.day)[0]
+
+    def slot(self, start_hour, end_hour, required=2, name='Shoot'):
+        return Event.objects.create(
+            event_name=name,
+            starts_at=self.midnight + timedelta(hours=start_hour),
+            ends_at=self.midnight + timedelta(hours=end_hour),
+            photographers_required=required
+        )
+
+    def assign(self, event):
+        return self.client.post(reverse('event-assign-photographers', args=[event.id]))
+
+    def assigned_ids(self, event):
+        return set(Assignment.objects.filter(event=event).values_list('photographer_id', flat=True))
+
+    def test_date_only_event_covers_the_whole_day(self):
+        response = self.client.post(
+            reverse('event-list'),
+            {'event_name': 'Wedding', 'event_date': self.day.isoformat(), 'photographers_required': 1},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = Event.objects.get()
+        self.assertEqual((event.starts_at, event.ends_at), whole_day(self.day))
+
+    def test_interval_sets_event_date(self):
+        starts_at = self.midnight + timedelta(hours=22)
+        response = self.client.post(
+            reverse('event-list'),
+            {
+                'event_name': 'Night shoot',
+                'starts_at': starts_at.isoformat(),
+                'ends_at': (starts_at + timedelta(hours=4)).isoformat(),
+                'photographers_required': 1
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['event_date'], self.day.isoformat())
+
+    def test_invalid_intervals_are_rejected(self):
+        starts_at = self.midnight + timedelta(hours=9)
+        for data in (
+            {'starts_at': starts_at.isoformat()},
+            {'starts_at': starts_at.isoformat(), 'ends_at': starts_at.isoformat()},
+            {},
+        ):
+            response = self.client.post(
+                reverse('event-list'),
+                {'event_name': 'Shoot', 'photographers_required': 1, **data},
+                format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+
+    def test_back_to_back_slots_share_photographers(self):
+        morning = self.slot(9, 13, required=4)
+        afternoon = self.slot(13, 18, required=4)
+        self.assertEqual(self.assign(morning).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.assign(afternoon).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.assigned_ids(morning), self.assigned_ids(afternoon))
+
+    def test_overlapping_slots_do_not_share_photographers(self):
+        morning = self.slot(9, 13)
+        lunch = self.slot(12, 14)
+        self.assign(morning)
+        self.assertEqual(self.assign(lunch).status_code, status.HTTP_201_CREATED)
+        self.assertFalse(self.assigned_ids(morning) & self.assigned_ids(lunch))
+
+        response = self.assign(self.slot(12.5, 13, required=1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['available'], 0)
+
+    def test_multi_day_event_conflicts_with_every_day_it_covers(self):
+        [festival] = make_events([19], photographers_required=2, name='Festival', days=3)
+        self.assign(festival)
+        self.assertEqual(free_photographers(*whole_day(self.day)).count(), 2)
+        self.assertEqual(free_photographers(*whole_day(self.day + timedelta(days=2))).count(), 4)
+
+        # A booking inside a later multi-day event's span also conflicts.
+        shoot = self.slot(9, 10, required=2)
+        self.assign(shoot)
+        [conference] = make_events([18], photographers_required=1, name='Conference', days=5)
+        response = self.assign(conference)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['available'], 0)
+
+    def test_moving_event_date_keeps_times_and_moves_assignments(self):
+        event = self.slot(9, 13)
+        self.assign(event)
+        event.event_date = self.day + timedelta(days=1)
+        event.save()
+        self.assertEqual(event.starts_at, self.midnight + timedelta(days=1, hours=9))
+        self.assertEqual(event.ends_at, self.midnight + timedelta(days=1, hours=13))
+        self.assertEqual(
+            set(Assignment.objects.filter(event=event).values_list('starts_at', flat=True)),
+            {event.starts_at}
+        )
+
+    def test_moved_assignments_are_stamped_and_logged(self):
+        event = self.slot(9, 13)
+        self.assign(event)
+        assigned = Assignment.objects.filter(event=event)
+        stamps = dict(assigned.values_list('id', 'updated_at'))
+        event.event_date = self.day + timedelta(days=1)
+        event.save()
+        for assignment in assigned:
+            self.assertGreater(assignment.updated_at, stamps[assignment.id])
+        entries = ChangeLogEntry.objects.filter(model='assignment', action=ChangeLogEntry.ACTION_UPDATE)
+        self.assertEqual(sorted(entries.values_list('object_id', flat=True)), sorted(stamps))
+        self.assertEqual(entries.first().data['event_date'], event.event_date.isoformat())
+
+    def test_put_of_fetched_event_can_change_its_date(self):
+        event = self.slot(9, 13)
+        url = reverse('event-detail', args=[event.id])
+        data = self.client.get(url).data
+        data['event_date'] = (self.day + timedelta(days=2)).isoformat()
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['event_date'], data['event_date'])
+        event.refresh_from_db()
+        self.assertEqual(event.starts_at, self.midnight + timedelta(days=2, hours=9))
+
+        # A new interval sent with the old event_date moves the date along.
+        data = self.client.get(url).data
+        data['starts_at'] = (self.midnight + timedelta(days=5, hours=9)).isoformat()
+        data['ends_at'] = (self.midnight + timedelta(days=5, hours=11)).isoformat()
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.data['event_date'], (self.day + timedelta(days=5)).isoformat())
+
+        # A date that contradicts a new interval is an error.
+        data['starts_at'] = (self.midnight + timedelta(days=6, hours=9)).isoformat()
+        data['ends_at'] = (self.midnight + timedelta(days=6, hours=11)).isoformat()
+        data['event_date'] = (self.day + timedelta(days=8)).isoformat()
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_move_that_double_books_is_rejected(self):
+        morning = self.slot(9, 13, required=4)
+        afternoon = self.slot(14, 18, required=4)
+        self.assign(morning)
+        self.assign(afternoon)
+
+        response = self.client.patch(
+            reverse('event-detail', args=[morning.id]),
+            {
+                'starts_at': (self.midnight + timedelta(hours=12)).isoformat(),
+                'ends_at': (self.midnight + timedelta(hours=16)).isoformat()
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        morning.refresh_from_db()
+        self.assertEqual(morning.ends_at, self.midnight + timedelta(hours=13))
+        self.assertEqual(
+            set(Assignment.objects.filter(event=morning).values_list('ends_at', flat=True)),
+            {morning.ends_at}
+        )
+
+        # With the move refused, a slot inside the afternoon still finds
+        # nobody free.
+        response = self.assign(self.slot(14.5, 15, required=1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        morning.event_date = self.day + timedelta(days=1)
+        morning.save()
+        afternoon.ends_at += timedelta(days=1, hours=2)
+        with self.assertRaises(ValidationError):
+            afternoon.save()
+
+    def test_forecast_counts_every_day_an_event_touches(self):
+        cache.clear()
+        night = self.slot(18, 34, required=1)
+        next_day = self.slot(38, 40, required=1)
+        self.assign(night)
+        self.assign(next_day)
+        self.assertEqual(self.assigned_ids(night), self.assigned_ids(next_day))
+
+        report = capacity_forecast(self.day, self.day + timedelta(days=1))
+        first, second = report['dates']
+        self.assertEqual((first['events'], first['required'], first['booked']), (1, 1, 1))
+        self.assertEqual((second['events'], second['required'], second['booked']), (2, 2, 2))
+        self.assertEqual(second['free'], 3)
+
+    def test_forecast_is_invalidated_in_every_month_an_event_touches(self):
+        cache.clear()
+        month_end = (self.day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        event = Event.objects.create(
+            event_name='Festival',
+            starts_at=whole_day(month_end)[0],
+            ends_at=whole_day(month_end, days=2)[1],
+            photographers_required=2
+        )
+        next_month = month_end + timedelta(days=1)
+        capacity_forecast(next_month, next_month)
+        self.assign(event)
+        self.assertEqual(capacity_forecast(next_month, next_month)['dates'][0]['booked'], 2)
+
+    def test_schedule_window_includes_events_that_started_before_it(self):
+        [festival] = make_events([19], photographers_required=1, name='Festival', days=3)
+        self.assign(festival)
+        photographer = Assignment.objects.get(event=festival).photographer
+        response = self.client.get(
+            reverse('photographer-schedule', args=[photographer.id]),
+            {'from': (self.day + timedelta(days=1)).isoformat()}
+        )
+        self.assertEqual([e['event_name'] for e in response.data['assigned_events']], ['Festival'])
+        response = self.client.get(
+            reverse('photographer-schedule', args=[photographer.id]),
+            {'from': (self.day + timedelta(days=2)).isoformat()}
+        )
+        self.assertEqual(response.data['assigned_events'], [])
+
+    def test_assignment_clean_rejects_overlap(self):
+        morning = self.slot(9, 13)
+        lunch = self.slot(12, 14)
+        Assignment.objects.create(event=morning, photographer=self.photographers[0])
+        with self.assertRaises(ValidationError):
+            Assignment(event=lunch, photographer=self.photographers[0]).full_clean()
+        Assignment(event=lunch, photographer=self.photographers[1]).full_clean()
+
+    def test_overlap_check_seeks_per_photographer_index(self):
+        plan = free_photographers(*whole_day(self.day)).explain()
+        self.assertIn('events_assi_photogr_d8f1f7_idx', plan)
+
+    def test_calendar_uses_times_for_slots(self):
+        event = self.slot(9, 13)
+        Assignment.objects.create(event=event, photographer=self.photographers[0])
+        response = self.client.get(
+            reverse('photographer-calendar', args=[self.photographers[0].id]),
+            HTTP_ACCEPT='text/calendar'
+        )
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'DTSTART:{self.day:%Y%m%d}T090000Z\r\n', body)
+        self.assertIn(f'DTEND:{self.day:%Y%m%d}T130000Z\r\n', body)
+
+
+class IntervalSnapshotTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographers = make_photographers(4)
+        cls.day = date.today() + timedelta(days=10)
+        festival = Event.objects.create(
+            event_name='Festival',
+            starts_at=whole_day(cls.day)[0],
+            ends_at=whole_day(cls.day, days=3)[1],
+            photographers_required=1
+        )
+        Assignment.objects.create(event=festival, photographer=cls.photographers[0])
+        morning = Event.objects.create(
+            event_name='Shoot',
+            starts_at=whole_day(cls.day + timedelta(days=5))[0] + timedelta(hours=9),
+            ends_at=whole_day(cls.day + timedelta(days=5))[0] + timedelta(hours=12),
+            photographers_required=1
+        )
+        Assignment.objects.create(event=morning, photographer=cls.photographers[1])
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'roster.snapshot')
+        override = override_settings(ROSTER_SNAPSHOT_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+        build_snapshot(self.path)
+
+    def test_bookings_mark_every_day_they_touch(self):
+        snapshot = get_snapshot()
+        ids = [p.id for p in self.photographers]
+        for offset in (0, 1, 2):
+            self.assertEqual(snapshot.available(self.day + timedelta(days=offset)), ids[1:])
+        self.assertEqual(snapshot.available(self.day + timedelta(days=3)), ids)
+        self.assertEqual(snapshot.available(self.day + timedelta(days=5)), [ids[0]] + ids[2:])
+        self.assertEqual(
+            snapshot.available(self.day, last_day=self.day + timedelta(days=5)),
+            ids[2:]
+        )
+
+    def test_snapshot_only_answers_whole_day_events(self):
+        [event] = make_events([12], photographers_required=2, days=2)
+        slot = Event.objects.create(
+            event_name='Slot',
+            starts_at=whole_day(self.day + timedelta(days=5))[0] + timedelta(hours=13),
+            ends_at=whole_day(self.day + timedelta(days=5))[0] + timedelta(hours=17),
+            photographers_required=4
+        )
+        build_snapshot(self.path)
+        response = self.client.post(reverse('event-assign-photographers', args=[event.id]))
+        self.assertEqual(
+            [p['id'] for p in response.data['assigned_photographers']],
+            [p.id for p in self.photographers[1:3]]
+        )
+        # Photographer 1's morning booking does not block an afternoon slot,
+        # even though the snapshot marks that whole day as booked.
+        response = self.client.post(reverse('event-assign-photographers', args=[slot.id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Photographer.objects.filter(assignments__event=slot).count(),
+            4
+        )
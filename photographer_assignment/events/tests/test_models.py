@@ -0,0 +1,70 @@
+from django.test import TestCase
+from datetime import date, timedelta
+from ..models import Event, Photographer, Assignment
+
+
+class PhotographerModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer = Photographer.objects.create(
+            name='Test Photographer',
+            email='test@example.com',
+            phone='+1234567890',
+            is_active=True
+        )
+
+    def test_photographer_creation(self):
+        self.assertEqual(self.photographer.name, 'Test Photographer')
+        self.assertEqual(self.photographer.email, 'test@example.com')
+        self.assertTrue(self.photographer.is_active)
+
+    def test_photographer_str(self):
+        self.assertEqual(str(self.photographer), 'Test Photographer')
+
+
+class EventModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(
+            event_name='Test Event',
+            event_date=date.today() + timedelta(days=10),
+            photographers_required=2
+        )
+
+    def test_event_creation(self):
+        self.assertEqual(self.event.event_name, 'Test Event')
+        self.assertEqual(self.event.photographers_required, 2)
+
+    def test_event_str(self):
+        expected = f"Test Event on {self.event.event_date}"
+        self.assertEqual(str(self.event), expected)
+
+
+class AssignmentModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographer = Photographer.objects.create(
+            name='Test Photographer',
+            email='test@example.com',
+            phone='+1234567890'
+        )
+        cls.event = Event.objects.create(
+            event_name='Test Event',
+            event_date=date.today() + timedelta(days=10),
+            photographers_required=1
+        )
+        cls.assignment = Assignment.objects.create(
+            event=cls.event,
+            photographer=cls.photographer
+        )
+
+    def test_assignment_creation(self):
+        self.assertEqual(self.assignment.event, self.event)
+        self.assertEqual(self.assignment.photographer, self.photographer)
+
+    def test_assignment_unique_constraint(self):
+        with self.assertRaises(Exception):
+            Assignment.objects.create(
+                event=self.event,
+                photographer=self.photographer
+            )
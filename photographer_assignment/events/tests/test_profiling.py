@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from ..profiling import RequestProfilerMiddleware, install_slow_query_log, profile_lock
+from .factories import make_events
+
+
+class ProfilerTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        [cls.event] = make_events([10], name='Test Event')
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def test_profiler_is_not_loaded_without_tokens_or_sampling(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilerMiddleware(lambda request: HttpResponse())
+
+    def test_allow_listed_header_profiles_request(self):
+        with self.settings(PROFILER_TOKENS=['secret'], PROFILER_OUTPUT_DIR=self.output_dir):
+            response = self.client.get(
+                reverse('event-detail', args=[self.event.id]),
+                HTTP_X_PROFILE='secret'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response['X-Profile-Id']
+        files = sorted(os.listdir(self.output_dir))
+        self.assertEqual(files, [
+            f'{profile_id}.collapsed',
+            f'{profile_id}.prof',
+            f'{profile_id}.sql.json',
+        ])
+        with open(os.path.join(self.output_dir, f'{profile_id}.sql.json')) as f:
+            report = json.load(f)
+        self.assertGreater(report['query_count'], 0)
+        origins = {(q['view'], q['serializer']) for q in report['queries']}
+        self.assertIn(('EventViewSet.retrieve', 'EventSerializer'), origins)
+
+    def test_unknown_token_is_not_profiled(self):
+        with self.settings(PROFILER_TOKENS=['secret'], PROFILER_OUTPUT_DIR=self.output_dir):
+            response = self.client.get(reverse('event-list'), {'profile': 'guess'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_concurrent_request_is_served_unprofiled(self):
+        # Another thread holds the lock while profiling its own request.
+        with profile_lock:
+            with self.settings(PROFILER_TOKENS=['secret'], PROFILER_OUTPUT_DIR=self.output_dir):
+                response = self.client.get(reverse('event-list'), HTTP_X_PROFILE='secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_failed_enable_serves_request_without_sampler(self):
+        threads = threading.active_count()
+        with mock.patch('cProfile.Profile.enable', side_effect=ValueError):
+            with self.settings(PROFILER_TOKENS=['secret'], PROFILER_OUTPUT_DIR=self.output_dir):
+                response = self.client.get(reverse('event-list'), HTTP_X_PROFILE='secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(threading.active_count(), threads)
+        self.assertFalse(profile_lock.locked())
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_query_log_records_view_and_serializer(self):
+        install_slow_query_log(sender=None, connection=connection)
+        self.addCleanup(connection.execute_wrappers.clear)
+        with self.assertLogs('events.slow_queries', level='WARNING') as logs:
+            self.client.get(reverse('event-detail', args=[self.event.id]))
+        self.assertTrue(any(
+            'view=EventViewSet.retrieve serializer=EventSerializer' in line
+            for line in logs.output
+        ))
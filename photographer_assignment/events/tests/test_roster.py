@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from ..models import Event, Assignment, ChangeLogEntry
+from ..roster import build_snapshot, get_snapshot
+from .factories import make_photographers
+
+
+class RosterSnapshotTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.photographers = make_photographers(12, inactive={3})
+        cls.day = date.today() + timedelta(days=7)
+        # Created through save() so the snapshot has a change-log version.
+        event = Event.objects.create(
+            event_name='Booked',
+            event_date=cls.day,
+            photographers_required=2
+        )
+        for photographer in (cls.photographers[0], cls.photographers[9]):
+            Assignment.objects.create(event=event, photographer=photographer)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'roster.snapshot')
+        override = override_settings(ROSTER_SNAPSHOT_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def expected_available(self):
+        return [
+            p.id for p in self.photographers
+            if p.is_active and p not in (self.photographers[0], self.photographers[9])
+        ]
+
+    def test_snapshot_matches_database(self):
+        build_snapshot(self.path)
+        snapshot = get_snapshot()
+        self.assertEqual(snapshot.version, ChangeLogEntry.objects.last().id)
+        self.assertEqual(snapshot.available(self.day), self.expected_available())
+        self.assertEqual(snapshot.available(self.day, limit=2), self.expected_available()[:2])
+        self.assertEqual(len(snapshot.available(date.today())), 11)
+        self.assertIsNone(snapshot.available(date.today() - timedelta(days=1)))
+
+    def test_readers_pick_up_rebuilt_snapshot(self):
+        build_snapshot(self.path)
+        first = get_snapshot()
+        self.assertIs(get_snapshot(), first)
+        self.photographers[3].is_active = True
+        self.photographers[3].save()
+        build_snapshot(self.path)
+        self.assertGreater(get_snapshot().version, first.version)
+        self.assertIn(self.photographers[3].id, get_snapshot().available(self.day))
+
+    def test_available_endpoint_reads_snapshot_without_queries(self):
+        build_snapshot(self.path)
+        get_snapshot()
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('photographer-available'),
+                {'date': self.day.isoformat()}
+            )
+        self.assertEqual(response.data['photographer_ids'], self.expected_available())
+
+    def test_available_endpoint_falls_back_to_database(self):
+        response = self.client.get(
+            reverse('photographer-available'),
+            {'date': self.day.isoformat()}
+        )
+        self.assertEqual(response.data['photographer_ids'], self.expected_available())
+        self.assertIsNone(response.data['snapshot_version'])
+
+    def test_assignment_uses_fresh_snapshot_and_ignores_stale_one(self):
+        event = Event.objects.create(
+            event_name='Wedding',
+            event_date=self.day,
+            photographers_required=3
+        )
+        build_snapshot(self.path)
+        response = self.client.post(reverse('event-assign-photographers', args=[event.id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [p['id'] for p in response.data['assigned_photographers']],
+            self.expected_available()[:3]
+        )
+
+        # The snapshot is now stale; the next event must not reuse those three.
+        other = Event.objects.create(
+            event_name='Party',
+            event_date=self.day,
+            photographers_required=2
+        )
+        response = self.client.post(reverse('event-assign-photographers', args=[other.id]))
+        self.assertEqual(
+            [p['id'] for p in response.data['assigned_photographers']],
+            self.expected_available()[3:5]
+        )
+
+    def test_command_skips_rebuild_when_current(self):
+        out = StringIO()
+        call_command('build_roster_snapshot', stdout=out)
+        call_command('build_roster_snapshot', stdout=out)
+        self.assertIn('Wrote roster snapshot', out.getvalue())
+        self.assertIn('Roster snapshot is current', out.getvalue())
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from photographer_system.middleware import PinPrimaryAfterWriteMiddleware
+from photographer_system.routers import PrimaryReplicaRouter, pin_primary
+from ..management.commands.sync_replicas import replicate
+from ..models import Event, Assignment
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTest(APITestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self):
+        self.assertIn(self.router.db_for_read(Event), ['replica_1', 'replica_2'])
+        self.assertEqual(self.router.db_for_write(Event), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        token = pin_primary.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Event), 'default')
+        finally:
+            pin_primary.reset(token)
+
+    def test_reads_in_one_request_use_one_replica(self):
+        seen = []
+
+        def view(request):
+            seen.append({self.router.db_for_read(Event) for _ in range(20)})
+            return HttpResponse()
+
+        middleware = PinPrimaryAfterWriteMiddleware(view)
+        for _ in range(50):
+            middleware(RequestFactory().get('/api/events/'))
+        self.assertTrue(all(len(aliases) == 1 for aliases in seen))
+        self.assertEqual(set.union(*seen), {'replica_1', 'replica_2'})
+
+    def test_related_reads_follow_the_instance(self):
+        event = Event(event_name='Test Event')
+        event._state.db = 'replica_2'
+        self.assertEqual(self.router.db_for_read(Assignment, instance=event), 'replica_2')
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'events'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'events'))
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post(
+            reverse('photographer-list'),
+            {'name': 'John Doe', 'email': 'john@example.com', 'phone': '+1234567890'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(PinPrimaryAfterWriteMiddleware.cookie_name, response.cookies)
+
+        seen = []
+        middleware = PinPrimaryAfterWriteMiddleware(
+            lambda request: seen.append(pin_primary.get()) or HttpResponse()
+        )
+        request = RequestFactory().get('/api/events/')
+        request.COOKIES = dict(
+            (name, morsel.value) for name, morsel in response.cookies.items()
+        )
+        middleware(request)
+        middleware(RequestFactory().get('/api/events/'))
+        self.assertEqual(seen, [True, False])
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post(reverse('photographer-list'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(PinPrimaryAfterWriteMiddleware.cookie_name, response.cookies)
+
+
+class ReplicationStandInTest(TestCase):
+    def test_replicate_copies_primary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary = os.path.join(directory, 'primary.sqlite3')
+            replica = os.path.join(directory, 'replica.sqlite3')
+            with closing(sqlite3.connect(primary)) as conn:
+                conn.execute('CREATE TABLE t (id INTEGER)')
+                conn.execute('INSERT INTO t VALUES (1), (2)')
+                conn.commit()
+
+            replicate(primary, replica)
+
+            with closing(sqlite3.connect(replica)) as conn:
+                self.assertEqual(conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 2)
@@ -1,10 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet, PhotographerViewSet
+from .views import (
+    EventViewSet,
+    PhotographerViewSet,
+    ChangeFeedViewSet,
+    CapacityForecastViewSet
+)
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet, basename='event')
 router.register(r'photographers', PhotographerViewSet, basename='photographer')
+router.register(r'changes', ChangeFeedViewSet, basename='change')
+router.register(r'capacity-forecast', CapacityForecastViewSet, basename='capacity-forecast')
 
 urlpatterns = [
     path('', include(router.urls)),
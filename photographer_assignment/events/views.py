@@ -1,18 +1,122 @@
-from datetime import date
-from django.db.models import Q, Count
+import json
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q, Count, Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from .models import Event, Photographer, Assignment
+from .models import (
+    Event,
+    Photographer,
+    Assignment,
+    ArchivedEvent,
+    ArchivedAssignment,
+    ChangeLogEntry,
+    whole_day
+)
+from . import roster
+from .assignment import AssignmentError, assign_available_photographers, free_photographers
+from .forecast import capacity_forecast
+from .ical import schedule_calendar
+from .renderers import EventStreamRenderer, ICalendarRenderer
 from .serializers import (
     EventSerializer,
     EventListSerializer,
     PhotographerSerializer,
     PhotographerScheduleSerializer,
-    AssignmentSerializer
+    AssignmentSerializer,
+    ArchivedEventSerializer,
+    ArchivedEventListSerializer,
+    ChangeLogEntrySerializer
 )
 
 
+def query_flag(request, name):
+    return request.query_params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def parse_ids(request):
+    raw = request.query_params.get('ids', '')
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+    except ValueError:
+        return None, Response(
+            {'error': 'ids must be a comma-separated list of integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not ids:
+        return None, Response(
+            {'error': 'ids is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(ids) > settings.BATCH_MAX_IDS:
+        return None, Response(
+            {
+                'error': 'Too many ids requested',
+                'max': settings.BATCH_MAX_IDS
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return ids, None
+
+
+def batch_response(ids, objects, serializer_class):
+    found = {obj.id: obj for obj in objects}
+    return Response({
+        'results': {
+            str(obj_id): serializer_class(found[obj_id]).data
+            for obj_id in ids if obj_id in found
+        },
+        'missing': [obj_id for obj_id in ids if obj_id not in found]
+    })
+
+
+SCHEDULE_WINDOW_PARAMS = {'from', 'to', 'upcoming', 'limit', 'cursor'}
+
+
+def parse_schedule_window(request):
+    params = request.query_params
+    try:
+        start = date.fromisoformat(params['from']) if params.get('from') else None
+        end = date.fromisoformat(params['to']) if params.get('to') else None
+    except ValueError:
+        return None, None, Response(
+            {'error': 'from and to must be dates in YYYY-MM-DD format'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if query_flag(request, 'upcoming'):
+        start = max(start, date.today()) if start else date.today()
+    if start and end and start > end:
+        return None, None, Response(
+            {'error': 'from must not be after to'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return start, end, None
+
+
+def archived_in_window(queryset, start, end):
+    # Archived rows overlap the window if any day they touch is inside it.
+    # With both bounds, rows starting inside the window are found on the
+    # event_date index and the few that started earlier and run into it on
+    # the last_date indexes, as the forecast does for the hot tables.
+    if start and end:
+        return queryset.filter(
+            Q(event_date__range=(start, end))
+            | Q(last_date__gt=F('event_date'), last_date__gte=start, event_date__lt=start)
+        )
+    if start:
+        queryset = queryset.filter(last_date__gte=start)
+    if end:
+        queryset = queryset.filter(event_date__lte=end)
+    return queryset
+
+
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
 
@@ -21,61 +125,77 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventListSerializer
         return EventSerializer
 
-    @action(detail=True, methods=['post'], url_path='assign-photographers')
-    def assign_photographers(self, request, pk=None):
-        event = self.get_object()
+    def list(self, request, *args, **kwargs):
+        if not query_flag(request, 'include_archived'):
+            return super().list(request, *args, **kwargs)
 
-        if event.photographers_required <= 0:
+        # The archive only grows, so archived events are listed for a bounded
+        # date window rather than all at once.
+        start, end, error = parse_schedule_window(request)
+        if error is not None:
+            return error
+        if not (start and end):
             return Response(
-                {'error': 'Photographers required must be greater than 0'},
+                {'error': 'include_archived requires from and to'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        if event.event_date < date.today():
-            return Response(
-                {'error': 'Cannot assign photographers to past events'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        existing_assignments = Assignment.objects.filter(event=event).count()
-        if existing_assignments > 0:
+        if (end - start).days >= settings.ARCHIVE_LIST_MAX_DAYS:
             return Response(
                 {
-                    'error': 'Photographers already assigned to this event',
-                    'assigned_count': existing_assignments
+                    'error': 'Date window is too long',
+                    'max_days': settings.ARCHIVE_LIST_MAX_DAYS
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        assigned_photographer_ids = Assignment.objects.filter(
-            event__event_date=event.event_date
-        ).values_list('photographer_id', flat=True)
+        response = super().list(request, *args, **kwargs)
+        response.data = response.data + ArchivedEventListSerializer(
+            archived_in_window(ArchivedEvent.objects.all(), start, end),
+            many=True
+        ).data
+        return response
 
-        available_photographers = Photographer.objects.filter(
-            is_active=True
-        ).exclude(
-            id__in=assigned_photographer_ids
-        )[:event.photographers_required]
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not query_flag(request, 'include_archived'):
+                raise
+        event = get_object_or_404(
+            ArchivedEvent.objects.prefetch_related(
+                Prefetch(
+                    'assignments',
+                    queryset=ArchivedAssignment.objects.select_related('photographer')
+                )
+            ),
+            pk=kwargs['pk']
+        )
+        return Response(ArchivedEventSerializer(event).data)
 
-        available_count = available_photographers.count()
+    def create(self, request, *args, **kwargs):
+        if not query_flag(request, 'assign'):
+            return super().create(request, *args, **kwargs)
 
-        if available_count < event.photographers_required:
-            return Response(
-                {
-                    'error': 'Not enough photographers available',
-                    'required': event.photographers_required,
-                    'available': available_count
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                event = serializer.save()
+                assignments = assign_available_photographers(event, check_existing=False)
+        except AssignmentError as error:
+            return Response(error.payload, status=status.HTTP_400_BAD_REQUEST)
 
-        assignments = []
-        for photographer in available_photographers:
-            assignment = Assignment.objects.create(
-                event=event,
-                photographer=photographer
-            )
-            assignments.append(assignment)
+        serializer.context['assignments'] = assignments
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], url_path='assign-photographers')
+    def assign_photographers(self, request, pk=None):
+        event = self.get_object()
+
+        try:
+            assignments = assign_available_photographers(event)
+        except AssignmentError as error:
+            return Response(error.payload, status=status.HTTP_400_BAD_REQUEST)
 
         assigned_photographers = [
             assignment.photographer for assignment in assignments
@@ -84,7 +204,10 @@ class EventViewSet(viewsets.ModelViewSet):
         return Response(
             {
                 'message': 'Photographers assigned successfully',
-                'event': EventSerializer(event).data,
+                'event': EventSerializer(
+                    event,
+                    context={'assignments': assignments}
+                ).data,
                 'assigned_photographers': PhotographerSerializer(
                     assigned_photographers,
                     many=True
@@ -93,6 +216,20 @@ class EventViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
 
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        ids, error = parse_ids(request)
+        if error is not None:
+            return error
+
+        events = Event.objects.filter(id__in=ids).prefetch_related(
+            Prefetch(
+                'assignments',
+                queryset=Assignment.objects.select_related('photographer')
+            )
+        )
+        return batch_response(ids, events, EventSerializer)
+
     @action(detail=True, methods=['get'])
     def assignments(self, request, pk=None):
         event = self.get_object()
@@ -110,5 +247,271 @@ class PhotographerViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def schedule(self, request, pk=None):
         photographer = self.get_object()
-        serializer = PhotographerScheduleSerializer(photographer)
-        return Response(serializer.data)
+        paginated = 'limit' in request.query_params or 'cursor' in request.query_params
+        archived = query_flag(request, 'include_archived')
+        if paginated and archived:
+            return Response(
+                {'error': 'include_archived cannot be combined with limit or cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not SCHEDULE_WINDOW_PARAMS & request.query_params.keys():
+            data = PhotographerScheduleSerializer(photographer).data
+            if archived:
+                data['assigned_events'] += self.get_archived_events(request, photographer)
+            return Response(data)
+
+        assignments, error = self.get_schedule_assignments(request, photographer)
+        if error is not None:
+            return error
+
+        next_cursor = None
+        if paginated:
+            max_size = settings.SCHEDULE_MAX_PAGE_SIZE
+            try:
+                limit = min(int(request.query_params.get('limit', max_size)), max_size)
+            except ValueError:
+                limit = max_size
+            limit = max(limit, 1)
+
+            cursor = request.query_params.get('cursor')
+            if cursor:
+                try:
+                    cursor_date, cursor_id = cursor.split('.')
+                    cursor_date = date.fromisoformat(cursor_date)
+                    cursor_id = int(cursor_id)
+                except ValueError:
+                    return Response(
+                        {'error': 'Invalid cursor'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                assignments = assignments.filter(
+                    Q(event_date__gt=cursor_date)
+                    | Q(event_date=cursor_date, id__gt=cursor_id)
+                )
+
+            assignments = list(assignments[:limit + 1])
+            if len(assignments) > limit:
+                assignments = assignments[:limit]
+                last = assignments[-1]
+                next_cursor = f"{last.event_date.isoformat()}.{last.id}"
+
+        data = PhotographerScheduleSerializer(
+            photographer,
+            context={'assignments': assignments}
+        ).data
+        if archived:
+            data['assigned_events'] = sorted(
+                self.get_archived_events(request, photographer) + data['assigned_events'],
+                key=lambda event: event['event_date']
+            )
+        data['next_cursor'] = next_cursor
+        return Response(data)
+
+    @action(detail=True, methods=['get'], renderer_classes=[ICalendarRenderer, JSONRenderer])
+    def calendar(self, request, pk=None):
+        photographer = self.get_object()
+        assignments, error = self.get_schedule_assignments(request, photographer)
+        if error is not None:
+            return error
+
+        response = StreamingHttpResponse(
+            schedule_calendar(
+                photographer,
+                assignments.iterator(chunk_size=settings.SCHEDULE_MAX_PAGE_SIZE)
+            ),
+            content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'inline; filename="photographer-{photographer.id}.ics"'
+        return response
+
+    def get_schedule_assignments(self, request, photographer):
+        start, end, error = parse_schedule_window(request)
+        if error is not None:
+            return None, error
+
+        # A booking is in the window if any day it touches is.
+        assignments = Assignment.objects.filter(photographer=photographer)
+        if start:
+            assignments = assignments.filter(last_date__gte=start)
+        if end:
+            assignments = assignments.filter(event_date__lte=end)
+        return assignments.select_related('event').order_by('event_date', 'id'), None
+
+    def get_archived_events(self, request, photographer):
+        start, end, _ = parse_schedule_window(request)
+        assignments = archived_in_window(
+            ArchivedAssignment.objects.filter(photographer=photographer),
+            start,
+            end
+        )
+        return ArchivedEventListSerializer(
+            [
+                assignment.event for assignment in
+                assignments.select_related('event').order_by('event_date', 'id')
+            ],
+            many=True
+        ).data
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        try:
+            day = date.fromisoformat(request.query_params.get('date', ''))
+        except ValueError:
+            return Response(
+                {'error': 'date must be a date in YYYY-MM-DD format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Served from the shared roster snapshot without touching the database;
+        # may lag writes by up to the snapshot refresh interval.
+        snapshot = roster.get_snapshot()
+        photographer_ids = snapshot.available(day) if snapshot is not None else None
+        if photographer_ids is not None:
+            return Response({
+                'date': day,
+                'photographer_ids': photographer_ids,
+                'snapshot_version': snapshot.version
+            })
+
+        return Response({
+            'date': day,
+            'photographer_ids': list(
+                free_photographers(*whole_day(day)).order_by(
+                    'name',
+                    'id'
+                ).values_list('id', flat=True)
+            ),
+            'snapshot_version': None
+        })
+
+    @action(detail=False, methods=['get'])
+    def schedules(self, request):
+        ids, error = parse_ids(request)
+        if error is not None:
+            return error
+
+        photographers = Photographer.objects.filter(id__in=ids).prefetch_related(
+            Prefetch(
+                'assignments',
+                queryset=Assignment.objects.select_related('event')
+            )
+        )
+        return batch_response(ids, photographers, PhotographerScheduleSerializer)
+
+
+class ChangeFeedViewSet(viewsets.GenericViewSet):
+    queryset = ChangeLogEntry.objects.all()
+    serializer_class = ChangeLogEntrySerializer
+
+    def get_cursor(self, request):
+        raw = request.query_params.get('since', request.headers.get('Last-Event-ID', 0))
+        try:
+            cursor = int(raw)
+        except (TypeError, ValueError):
+            return None
+        return cursor if cursor >= 0 else None
+
+    def check_cursor(self, cursor):
+        if cursor is None:
+            return Response(
+                {'error': 'since must be a non-negative integer cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Pruning always keeps the newest entry, so an empty log means no
+        # cursor other than 0 can be served.
+        oldest = ChangeLogEntry.objects.values_list('id', flat=True).first()
+        if cursor and (oldest is None or cursor < oldest - 1):
+            return Response(
+                {
+                    'error': 'Cursor is older than the retained change log, resync required',
+                    'oldest': oldest
+                },
+                status=status.HTTP_410_GONE
+            )
+        return None
+
+    def list(self, request):
+        cursor = self.get_cursor(request)
+        error = self.check_cursor(cursor)
+        if error is not None:
+            return error
+
+        page_size = settings.CHANGE_FEED_PAGE_SIZE
+        try:
+            limit = min(int(request.query_params.get('limit', page_size)), page_size)
+        except ValueError:
+            limit = page_size
+        limit = max(limit, 1)
+
+        entries = list(ChangeLogEntry.objects.filter(id__gt=cursor)[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        return Response({
+            'results': self.get_serializer(entries, many=True).data,
+            'cursor': entries[-1].id if entries else cursor,
+            'has_more': has_more
+        })
+
+    @action(detail=False, methods=['get'], renderer_classes=[EventStreamRenderer])
+    def stream(self, request):
+        cursor = self.get_cursor(request)
+        error = self.check_cursor(cursor)
+        if error is not None:
+            return error
+
+        response = StreamingHttpResponse(
+            self.event_stream(cursor),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def event_stream(self, cursor):
+        poll_seconds = settings.CHANGE_FEED_STREAM_POLL_SECONDS
+        page_size = settings.CHANGE_FEED_PAGE_SIZE
+        deadline = time.monotonic() + settings.CHANGE_FEED_STREAM_MAX_SECONDS
+
+        yield f"retry: {int(poll_seconds * 1000)}\n\n"
+        while True:
+            entries = list(ChangeLogEntry.objects.filter(id__gt=cursor)[:page_size])
+            for entry in entries:
+                cursor = entry.id
+                data = json.dumps(
+                    ChangeLogEntrySerializer(entry).data,
+                    cls=DjangoJSONEncoder
+                )
+                yield f"id: {entry.id}\nevent: {entry.action}\ndata: {data}\n\n"
+            if len(entries) == page_size:
+                continue
+            if time.monotonic() >= deadline:
+                return
+            if not entries:
+                yield ": keep-alive\n\n"
+            time.sleep(poll_seconds)
+
+
+class CapacityForecastViewSet(viewsets.ViewSet):
+    def list(self, request):
+        max_days = settings.CAPACITY_FORECAST_MAX_DAYS
+        try:
+            days = int(request.query_params.get('days', 90))
+        except ValueError:
+            days = -1
+        if not 0 <= days <= max_days:
+            return Response(
+                {
+                    'error': 'days must be an integer between 0 and the maximum horizon',
+                    'max': max_days
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start = date.today()
+        report = capacity_forecast(start, start + timedelta(days=days))
+        if query_flag(request, 'shortfall_only'):
+            report['dates'] = [day for day in report['dates'] if day['shortfall']]
+        report['shortfall_dates'] = [day['date'] for day in report['dates'] if day['shortfall']]
+        return Response(report)
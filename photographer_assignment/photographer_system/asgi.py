@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'photographer_system.settings')
 
 application = get_asgi_application()
+
+if getattr(settings, 'WARM_UP_ON_BOOT', False):
+    from .warmup import warm_up
+
+    warm_up()
@@ -0,0 +1,40 @@
+import time
+from django.conf import settings
+from .routers import choose_replica, pin_primary, read_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PinPrimaryAfterWriteMiddleware:
+    cookie_name = 'pin_primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in SAFE_METHODS
+        pinned = is_write or self.recently_wrote(request)
+        token = pin_primary.set(pinned)
+        replica_token = read_replica.set(None if pinned else choose_replica())
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(replica_token)
+            pin_primary.reset(token)
+
+        if is_write and response.status_code < 400:
+            window = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def recently_wrote(self, request):
+        try:
+            return int(request.COOKIES[self.cookie_name]) > time.time()
+        except (KeyError, ValueError):
+            return False
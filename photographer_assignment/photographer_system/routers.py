@@ -0,0 +1,39 @@
+import random
+from contextvars import ContextVar
+from django.conf import settings
+
+pin_primary = ContextVar('pin_primary', default=False)
+
+# Set once per request by PinPrimaryAfterWriteMiddleware so that every read
+# in a request sees the same replica's snapshot.
+read_replica = ContextVar('read_replica', default=None)
+
+
+def choose_replica():
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+class PrimaryReplicaRouter:
+    primary = 'default'
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects are read from where the instance was loaded.
+            return instance._state.db
+        if not settings.DATABASE_REPLICAS or pin_primary.get():
+            return self.primary
+        return read_replica.get() or choose_replica()
+
+    def db_for_write(self, model, **hints):
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {self.primary, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.primary
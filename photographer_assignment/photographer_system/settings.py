@@ -22,6 +22,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'events.profiling.RequestProfilerMiddleware',
+    'photographer_system.middleware.PinPrimaryAfterWriteMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,9 +56,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so read-then-write transactions
+            # (availability check, then insert) serialise instead of racing.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # File-backed so the test suite sees real SQLite locking; with
+        # --parallel every worker gets its own copy of this file.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+TEST_RUNNER = 'photographer_system.test_runner.ParallelDiscoverRunner'
+
+for index in range(1, int(os.environ.get('DATABASE_REPLICA_COUNT', 0)) + 1):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.replica_{index}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['photographer_system.routers.PrimaryReplicaRouter']
+
+# Reads from a client that wrote within this many seconds go to the primary.
+# Keep it above the replicas' worst expected replication lag.
+REPLICA_STICKY_SECONDS = 5
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -93,3 +121,67 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
 }
+
+BATCH_MAX_IDS = 100
+
+SCHEDULE_MAX_PAGE_SIZE = 500
+
+CAPACITY_FORECAST_MAX_DAYS = 730
+
+# Cached forecast buckets are invalidated on writes; the timeout only bounds
+# staleness for writes made by other processes when CACHES is process-local.
+CAPACITY_FORECAST_CACHE_SECONDS = 300
+
+ARCHIVE_AFTER_DAYS = 365
+
+ARCHIVE_LIST_MAX_DAYS = 366
+
+# Written by the build_roster_snapshot command and mapped read-only by every
+# worker. Leave unset to always read availability from the database.
+ROSTER_SNAPSHOT_PATH = os.environ.get('ROSTER_SNAPSHOT_PATH')
+
+ROSTER_HORIZON_DAYS = 730
+
+CHANGE_FEED_RETENTION_DAYS = 7
+
+CHANGE_FEED_PAGE_SIZE = 500
+
+CHANGE_FEED_STREAM_POLL_SECONDS = 2
+
+CHANGE_FEED_STREAM_MAX_SECONDS = 300
+
+# Requests carrying one of these tokens in an X-Profile header or ?profile=
+# query parameter are profiled; PROFILER_SAMPLE_RATE profiles a random share
+# of all requests. With neither set the profiler middleware is not loaded.
+PROFILER_TOKENS = [
+    token for token in os.environ.get('PROFILER_TOKENS', '').split(',') if token
+]
+
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+
+PROFILER_STACK_INTERVAL = 0.001
+
+PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR', BASE_DIR / 'profiles')
+
+# Queries slower than this are logged to events.slow_queries; None disables.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ['SLOW_QUERY_THRESHOLD_MS'])
+    if os.environ.get('SLOW_QUERY_THRESHOLD_MS') else None
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'events.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
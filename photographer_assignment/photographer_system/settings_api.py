@@ -0,0 +1,49 @@
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'events',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'events.profiling.RequestProfilerMiddleware',
+    'photographer_system.middleware.PinPrimaryAfterWriteMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'photographer_system.urls_api'
+
+DATABASES = {
+    alias: {
+        **config,
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    for alias, config in DATABASES.items()
+}
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+STATIC_URL = None
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.AllowAny',
+    ],
+    'UNAUTHENTICATED_USER': None,
+}
+
+WARM_UP_ON_BOOT = True
@@ -0,0 +1,11 @@
+from django.test.runner import DiscoverRunner, get_max_test_processes
+
+
+class ParallelDiscoverRunner(DiscoverRunner):
+    # `manage.py test` uses every core unless --parallel N is given; each
+    # worker runs against its own clone of the test database. --parallel 1
+    # (or --pdb) keeps everything in one process.
+    def __init__(self, *args, parallel=0, pdb=False, **kwargs):
+        if not parallel and not pdb:
+            parallel = get_max_test_processes()
+        super().__init__(*args, parallel=parallel, pdb=pdb, **kwargs)
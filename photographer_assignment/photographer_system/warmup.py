@@ -0,0 +1,19 @@
+from django.apps import apps
+from django.urls import get_resolver
+from rest_framework.settings import api_settings
+
+
+def warm_up():
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta._relation_tree
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+
+    api_settings.DEFAULT_RENDERER_CLASSES
+    api_settings.DEFAULT_PARSER_CLASSES
+    api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    api_settings.DEFAULT_PERMISSION_CLASSES
+    api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS